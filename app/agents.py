@@ -1,19 +1,41 @@
 import os
+import threading
+from functools import lru_cache
 import yaml
 from crewai import Agent
 from langchain_openai import ChatOpenAI
+from app.tools import download_audio_tool, transcribe_audio_tool, summarize_text_tool
+
+# Tool each agent uses to do its work
+AGENT_TOOLS = {
+    'youtube_downloader': [download_audio_tool],
+    'audio_transcriber': [transcribe_audio_tool],
+    'content_summarizer': [summarize_text_tool]
+}
+
+# Use the libyaml-backed loader when PyYAML was built with it
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 # Load agent configurations
+@lru_cache(maxsize=4)
 def load_agent_configs(config_path="app/config/agents.yaml"):
-    """Load agent configurations from YAML file."""
+    """Load agent configurations from YAML file (parsed once per path and process)."""
     with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=YAML_LOADER)
 
 # Set up the LLM
+_LLM_LOCK = threading.Lock()
+
+@lru_cache(maxsize=None)
+def _create_llm(model):
+    """Create the single shared ChatOpenAI client for a model."""
+    return ChatOpenAI(temperature=0.7, model=model)
+
 def get_llm(model=None):
-    """Get the LLM instance with the specified model or default from env variable."""
+    """Get the shared LLM instance for the specified model or the default from env variable."""
     model = model or os.getenv('MODEL_NAME', 'gpt-3.5-turbo')
-    return ChatOpenAI(temperature=0.7, model=model)
+    with _LLM_LOCK:
+        return _create_llm(model)
 
 # Define our agents
 def create_agents():
@@ -26,14 +48,36 @@ def create_agents():
         if key in configs:
             agents[key] = Agent(
                 config=configs[key],
-                llm=get_llm()
+                llm=get_llm(),
+                tools=AGENT_TOOLS[key]
             )
     
     # Create summarizer agent with advanced model
     if 'content_summarizer' in configs:
         agents['content_summarizer'] = Agent(
             config=configs['content_summarizer'],
-            llm=get_llm("gpt-4-turbo")
+            llm=get_llm("gpt-4-turbo"),
+            tools=AGENT_TOOLS['content_summarizer']
         )
     
-    return agents 
\ No newline at end of file
+    return agents
+
+# Agents shared by every run in this process
+_AGENTS = None
+_AGENTS_LOCK = threading.Lock()
+
+def get_agents():
+    """Return the shared agents, creating them on first use."""
+    global _AGENTS
+    if _AGENTS is None:
+        with _AGENTS_LOCK:
+            if _AGENTS is None:
+                _AGENTS = create_agents()
+    return _AGENTS
+
+def reset_agents():
+    """Drop the shared agents and cached configs so the next use rebuilds them."""
+    global _AGENTS
+    with _AGENTS_LOCK:
+        _AGENTS = None
+        load_agent_configs.cache_clear()
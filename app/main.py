@@ -1,86 +1,92 @@
 import os
-import logging
+import asyncio
 import argparse
 from dotenv import load_dotenv
-from crewai import Crew, Process
 
-from app.agents import create_agents
-from app.tasks import create_tasks, configure_download_task, configure_transcription_task, configure_summarization_task
-from utils.youtube_downloader import download_youtube_audio
-from utils.transcriber import transcribe_audio
-from utils.summarizer import summarize_text
+from utils.youtube_downloader import download_youtube_audio, adownload_youtube_audio, DownloadFailed
+from utils.transcriber import transcribe_audio, atranscribe_audio
+from utils.summarizer import summarize_text, asummarize_text
+from utils.clients import run_with_client
+from utils.logger import logger
 
 # Load environment variables
 load_dotenv()
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
-
 def run_youtube_processing(youtube_url, prompt_instruction):
-    """Run the YouTube processing pipeline."""
-    # Create agents
-    agents_dict = create_agents()
-    
-    # Create task dictionary
-    tasks_dict = create_tasks(agents_dict)
-    
-    # Configure the first task - downloading
-    configure_download_task(
-        tasks_dict, 
-        agents_dict['youtube_downloader'], 
-        youtube_url
-    )
-    
-    # Execute download task
-    download_result = tasks_dict['download_task'].execute()
-    audio_file_path = download_result
+    """
+    Run the YouTube processing pipeline for one video.
     
-    # Configure the second task - transcription
-    configure_transcription_task(
-        tasks_dict,
-        agents_dict['audio_transcriber'],
-        audio_file_path
-    )
+    Download, transcription and summarization are deterministic steps, so
+    the utilities are called directly rather than planned by an LLM.
     
-    # Execute transcription task
-    transcription_result = tasks_dict['transcription_task'].execute()
-    transcript_file, transcript_text = transcription_result
+    Returns:
+        The summary, or None if the video could not be downloaded
+    """
+    try:
+        audio_file_path = download_youtube_audio(youtube_url)
+    except DownloadFailed as e:
+        logger.error(f"Skipping {youtube_url}: {str(e)}")
+        return None
+    _, transcript_text = transcribe_audio(audio_file_path, youtube_url=youtube_url)
+    _, summary = summarize_text(transcript_text, prompt_instruction, youtube_url=youtube_url)
+    return summary
+
+async def _aprocess_one(youtube_url, prompt_instruction):
+    """Async counterpart of run_youtube_processing."""
+    try:
+        audio_file_path = await adownload_youtube_audio(youtube_url)
+    except DownloadFailed as e:
+        logger.error(f"Skipping {youtube_url}: {str(e)}")
+        return None
+    _, transcript_text = await atranscribe_audio(audio_file_path, youtube_url=youtube_url)
+    _, summary = await asummarize_text(transcript_text, prompt_instruction, youtube_url=youtube_url)
+    return summary
+
+async def arun_youtube_processing_batch(pairs):
+    """
+    Run the YouTube processing pipeline for several videos concurrently.
     
-    # Configure the third task - summarization
-    configure_summarization_task(
-        tasks_dict,
-        agents_dict['content_summarizer'],
-        transcript_text,
-        prompt_instruction
+    Args:
+        pairs: List of (youtube_url, prompt_instruction) tuples
+        
+    Returns:
+        List of summaries in input order, with None for a video that could not
+        be downloaded and the exception for one that failed later, so one bad
+        URL does not discard the other summaries
+    """
+    return await asyncio.gather(
+        *(_aprocess_one(url, prompt) for url, prompt in pairs),
+        return_exceptions=True
     )
-    
-    # Execute summarization task
-    summarization_result = tasks_dict['summarization_task'].execute()
-    summary_file, summary_text = summarization_result
-    
-    return summary_text
 
 def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="YouTube Transcriber and Summarizer")
-    parser.add_argument("youtube_url", help="URL of the YouTube video to process")
+    parser.add_argument("youtube_urls", nargs="+", help="URL(s) of the YouTube video(s) to process")
     parser.add_argument("prompt", help="Prompt instruction for summarization")
     
     args = parser.parse_args()
     
-    # Process the YouTube video
-    result = run_youtube_processing(args.youtube_url, args.prompt)
+    # Process the YouTube video(s)
+    if len(args.youtube_urls) == 1:
+        results = [run_youtube_processing(args.youtube_urls[0], args.prompt)]
+    else:
+        results = run_with_client(arun_youtube_processing_batch(
+            [(url, args.prompt) for url in args.youtube_urls]
+        ))
     
-    # Print the summary
-    print("\n" + "="*50)
-    print("SUMMARY")
-    print("="*50)
-    print(result)
-    print("="*50)
+    # Print the summaries
+    for url, result in zip(args.youtube_urls, results):
+        print("\n" + "="*50)
+        print(f"SUMMARY: {url}")
+        print("="*50)
+        if result is None:
+            print("FAILED: the video could not be downloaded")
+        elif isinstance(result, Exception):
+            print(f"FAILED: {str(result)}")
+        else:
+            print(result)
+        print("="*50)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
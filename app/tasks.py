@@ -1,59 +1,73 @@
+import threading
+from functools import lru_cache
 import yaml
 from crewai import Task
-from utils.youtube_downloader import download_youtube_audio
-from utils.transcriber import transcribe_audio
-from utils.summarizer import summarize_text
+from app.agents import YAML_LOADER, load_agent_configs
 
 # Load task configurations
+@lru_cache(maxsize=4)
 def load_task_configs(config_path="app/config/tasks.yaml"):
-    """Load task configurations from YAML file."""
+    """Load task configurations from YAML file (parsed once per path and process)."""
     with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=YAML_LOADER)
 
-def create_tasks(agents):
-    """Create all tasks for the processing pipeline."""
-    configs = load_task_configs()
-    
-    # Map of task types to their function handlers
-    task_handlers = {
-        'download_task': download_youtube_audio,
-        'transcription_task': transcribe_audio,
-        'summarization_task': summarize_text
-    }
-    
-    # Empty dictionary to store task objects (will be populated later)
-    return {
-        'download_task': None,
-        'transcription_task': None, 
-        'summarization_task': None
-    }
+def invalidate_config_cache():
+    """Forget the parsed agent and task configs so the YAML files are read again."""
+    load_task_configs.cache_clear()
+    load_agent_configs.cache_clear()
 
-def configure_download_task(task_dict, agent, youtube_url):
-    """Configure the download task with runtime parameters."""
+def create_tasks(agents, async_execution=False):
+    """
+    Create all tasks for the processing pipeline.
+    
+    Each task lists the previous one as context, so crewAI passes the audio
+    path to the transcription task and the transcript to the summarization
+    task. Runtime inputs ({youtube_url}, {prompt_instruction}) are filled in
+    by crew.kickoff. Pass async_execution=True to let crewAI run the tasks
+    asynchronously.
+    """
     configs = load_task_configs()
-    task_dict['download_task'] = Task(
+    
+    download_task = Task(
         config=configs['download_task'],
-        agent=agent,
-        context={'youtube_url': youtube_url},
-        function=lambda: download_youtube_audio(youtube_url)
+        async_execution=async_execution,
+        agent=agents['youtube_downloader']
     )
-    
-def configure_transcription_task(task_dict, agent, audio_file_path):
-    """Configure the transcription task with runtime parameters."""
-    configs = load_task_configs()
-    task_dict['transcription_task'] = Task(
+    transcription_task = Task(
         config=configs['transcription_task'],
-        agent=agent,
-        context={'audio_file_path': audio_file_path},
-        function=lambda: transcribe_audio(audio_file_path)
+        async_execution=async_execution,
+        agent=agents['audio_transcriber'],
+        context=[download_task]
     )
-    
-def configure_summarization_task(task_dict, agent, transcript_text, prompt_instruction):
-    """Configure the summarization task with runtime parameters."""
-    configs = load_task_configs()
-    task_dict['summarization_task'] = Task(
+    summarization_task = Task(
         config=configs['summarization_task'],
-        agent=agent,
-        context={'prompt_instruction': prompt_instruction},
-        function=lambda: summarize_text(transcript_text, prompt_instruction)
-    ) 
\ No newline at end of file
+        async_execution=async_execution,
+        agent=agents['content_summarizer'],
+        context=[transcription_task]
+    )
+    
+    return {
+        'download_task': download_task,
+        'transcription_task': transcription_task,
+        'summarization_task': summarization_task
+    }
+
+# Tasks shared by every run in this process
+_TASKS = None
+_TASKS_LOCK = threading.Lock()
+
+def get_tasks(agents):
+    """Return the shared tasks, creating them on first use."""
+    global _TASKS
+    if _TASKS is None:
+        with _TASKS_LOCK:
+            if _TASKS is None:
+                _TASKS = create_tasks(agents)
+    return _TASKS
+
+def reset_tasks():
+    """Drop the shared tasks and cached configs so the next use rebuilds them."""
+    global _TASKS
+    with _TASKS_LOCK:
+        _TASKS = None
+        load_task_configs.cache_clear()
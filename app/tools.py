@@ -0,0 +1,21 @@
+from crewai.tools import tool
+from utils.youtube_downloader import download_youtube_audio
+from utils.transcriber import transcribe_audio
+from utils.summarizer import summarize_text
+
+@tool("Download YouTube audio")
+def download_audio_tool(youtube_url: str) -> str:
+    """Download the audio of a YouTube video and return the file path."""
+    return download_youtube_audio(youtube_url)
+
+@tool("Transcribe audio file")
+def transcribe_audio_tool(audio_file_path: str) -> str:
+    """Transcribe an audio file to text and return the transcript."""
+    transcript_file, transcript_text = transcribe_audio(audio_file_path)
+    return transcript_text
+
+@tool("Summarize transcript")
+def summarize_text_tool(transcript_text: str, prompt_instruction: str) -> str:
+    """Summarize a transcript following the prompt instruction and return the summary."""
+    summary_file, summary = summarize_text(transcript_text, prompt_instruction)
+    return summary
@@ -7,32 +7,47 @@ leveraging the functionality from transcribe.py.
 """
 
 import os
-import logging
-import pandas as pd
+import io
+import csv
+import asyncio
+import argparse
 import time
 import random
 from dotenv import load_dotenv
 from typing import List, Dict, Any
-from openai import OpenAIError, RateLimitError
+from openai import APIConnectionError, InternalServerError, RateLimitError
 
 # Import core utility functions directly
-from utils.youtube_downloader import download_youtube_audio
-from utils.transcriber import transcribe_audio
-from utils.summarizer import summarize_text
+from utils.youtube_downloader import download_youtube_audio, download_youtube_audio_bytes, get_cached_audio, YtDlpNotInstalled
+from utils.transcriber import transcribe_audio, transcribe_bytes, warm_up_transcriber, get_cached_transcript, transcript_file_path
+from utils.summarizer import summarize_text_batch
+from utils.openai_batch import submit_summaries
+from utils.cache import disable_cache
+from utils.clients import run_with_client
+from utils.throttle import TokenBucket, throttled, estimate_tokens
+from utils.logger import logger
+from utils.urls import get_video_id
 
 # Load environment variables
 load_dotenv()
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+# Number of transcripts summarized together in one OpenAI request
+BATCH_SIZE = 4
+
+# OpenAI rate limits used to pace requests before they are sent (0 disables a limit)
+TRANSCRIPTION_RPM = int(os.getenv('TRANSCRIPTION_RPM', '50'))
+SUMMARY_RPM = int(os.getenv('SUMMARY_RPM', '500'))
+SUMMARY_TPM = int(os.getenv('SUMMARY_TPM', '200000'))
+
+# Completion tokens reserved per summary when estimating request size
+SUMMARY_MAX_TOKENS = 1000
 
 def retry_with_backoff(func, max_retries=3, initial_delay=1, max_delay=60):
     """
-    Retry a function with exponential backoff.
+    Retry a function with exponential backoff on transient OpenAI errors.
+    
+    Requests are paced up front by TokenBucket, so this is only a fallback
+    for server errors, dropped connections and occasional rate-limit hits.
     
     Args:
         func: Function to retry
@@ -49,13 +64,13 @@ def retry_with_backoff(func, max_retries=3, initial_delay=1, max_delay=60):
     for attempt in range(max_retries):
         try:
             return func()
-        except (RateLimitError, OpenAIError) as e:
+        except (RateLimitError, InternalServerError, APIConnectionError) as e:
             last_exception = e
             if attempt < max_retries - 1:
                 # Add jitter to prevent thundering herd
                 jitter = random.uniform(0, 0.1 * delay)
                 wait_time = delay + jitter
-                logger.warning(f"OpenAI API rate limit hit. Retrying in {wait_time:.2f} seconds... (Attempt {attempt + 1}/{max_retries})")
+                logger.warning(f"Transient OpenAI API error ({type(e).__name__}). Retrying in {wait_time:.2f} seconds... (Attempt {attempt + 1}/{max_retries})")
                 time.sleep(wait_time)
                 delay = min(delay * 2, max_delay)  # Exponential backoff with max delay
             else:
@@ -65,35 +80,51 @@ def retry_with_backoff(func, max_retries=3, initial_delay=1, max_delay=60):
             logger.error(f"Unexpected error: {str(e)}")
             raise e
 
-def process_youtube_urls(urls: List[str], prompt: str, use_mock: bool = False, wait_min: int = 3, wait_max: int = 10) -> List[Dict[str, Any]]:
+def _new_result(url: str, prompt: str) -> Dict[str, Any]:
+    """Create the initial result state for a URL."""
+    return {
+        "youtube_url": url,
+        "prompt_instruction": prompt,
+        "audio_file_path": "",
+        "transcript_text": "",
+        "transcript_file": "",
+        "summary": "",
+        "current_step": "download",
+        "error": ""
+    }
+
+def _mark_failed(result: Dict[str, Any], e: Exception) -> None:
+    """Record a processing error on a result."""
+    error_msg = f"Processing failed at step {result['current_step']}: {str(e)}"
+    logger.error(error_msg)
+    result["error"] = error_msg
+    result["current_step"] = "end"
+
+async def aprocess_youtube_urls(urls: List[str], prompt: str, use_mock: bool = False, queue_size: int = 2, batch_size: int = BATCH_SIZE, use_batch_api: bool = False, keep_audio: bool = False) -> List[Dict[str, Any]]:
     """
     Process multiple YouTube URLs with the same prompt instruction.
     
+    Download, transcription and summarization run as a three-stage pipeline
+    connected by bounded queues, so video N+1 downloads while video N is
+    transcribed and video N-1 is summarized.
+    
     Args:
         urls: List of YouTube URLs to process
         prompt: Prompt instruction for summarization
         use_mock: Whether to use mock data for demonstration
-        wait_min: Minimum wait time in seconds between YouTube downloads
-        wait_max: Maximum wait time in seconds between YouTube downloads
+        queue_size: Maximum number of items waiting between two stages
+        batch_size: Number of transcripts summarized together in one request
+        use_batch_api: Whether to submit all summaries as one OpenAI Batch API job
+        keep_audio: Whether to save the audio in downloads/, in its original
+            container, instead of transcribing it straight from memory
         
     Returns:
-        List of result dictionaries containing processed data
+        List of result dictionaries containing processed data, in input order
     """
-    results = []
-    
-    # Process each URL
-    for i, url in enumerate(urls):
-        logger.info(f"Processing URL {i+1}/{len(urls)}: {url}")
-        
-        # Add a random wait time between requests to avoid rate limiting
-        if i > 0:
-            wait_time = random.randint(wait_min, wait_max)
-            logger.info(f"Waiting {wait_time} seconds before processing next URL...")
-            time.sleep(wait_time)
-        
-        if use_mock:
-            # Mock result
-            result = {
+    if use_mock:
+        # Mock results
+        return [
+            {
                 "youtube_url": url,
                 "prompt_instruction": prompt,
                 "audio_file_path": f"mock_audio_{i}.mp3",
@@ -103,63 +134,183 @@ def process_youtube_urls(urls: List[str], prompt: str, use_mock: bool = False, w
                 "current_step": "end",
                 "error": ""
             }
-        else:
-            # Define initial result state
-            result = {
-                "youtube_url": url,
-                "prompt_instruction": prompt,
-                "audio_file_path": "",
-                "transcript_text": "",
-                "transcript_file": "",
-                "summary": "",
-                "current_step": "download",
-                "error": ""
-            }
+            for i, url in enumerate(urls)
+        ]
+    
+    results = [_new_result(url, prompt) for url in urls]
+    
+    # Warm up the OpenAI client while the first video downloads
+    warm_up_transcriber()
+    
+    # Pace OpenAI calls against the configured limits instead of sleeping
+    # between URLs and reacting to rate-limit errors
+    transcription_bucket = TokenBucket(TRANSCRIPTION_RPM)
+    summary_bucket = TokenBucket(SUMMARY_RPM, SUMMARY_TPM)
+    
+    loop = asyncio.get_running_loop()
+    
+    def acquire_transcription_request():
+        # Runs on the transcription thread before every OpenAI request, so long
+        # audio split into chunks is charged one request per chunk
+        asyncio.run_coroutine_threadsafe(transcription_bucket.acquire(), loop).result()
+    
+    async def transcribe_with_retry(transcribe_fn, *args):
+        return await asyncio.to_thread(
+            retry_with_backoff,
+            lambda: transcribe_fn(*args, before_request=acquire_transcription_request),
+            max_retries=3,
+            initial_delay=5,
+            max_delay=60
+        )
+    
+    @throttled(summary_bucket, lambda texts, prompt, youtube_urls: sum(estimate_tokens(text, SUMMARY_MAX_TOKENS) for text in texts) + estimate_tokens(prompt))
+    def summarize_with_retry(texts, prompt, youtube_urls):
+        # The URLs name each summary file after its video, so videos sharing a prompt do not overwrite each other
+        return retry_with_backoff(lambda: summarize_text_batch(texts, prompt, youtube_urls=youtube_urls))
+    
+    # Queues carry result indexes; None tells the next stage to stop.
+    # A slow stage back-pressures the ones before it.
+    download_q = asyncio.Queue(maxsize=queue_size)
+    transcribe_q = asyncio.Queue(maxsize=queue_size)
+    summary_q = asyncio.Queue(maxsize=queue_size)
+    
+    # (audio_bytes, file_name) for videos held in memory, by result index
+    audio_in_memory = {}
+    
+    async def producer():
+        for i in range(len(urls)):
+            await download_q.put(i)
+        await download_q.put(None)
+    
+    async def downloader_worker():
+        while (i := await download_q.get()) is not None:
+            result = results[i]
+            url = result["youtube_url"]
+            logger.info(f"Processing URL {i+1}/{len(urls)}: {url}")
+            
+            # Skip download and transcription when an earlier run already transcribed this video
+            video_id = get_video_id(url)
+            cached_transcript = get_cached_transcript(transcript_file_path("transcripts", video_id))
+            if cached_transcript:
+                result["transcript_file"], result["transcript_text"] = cached_transcript
+                result["current_step"] = "summarization"
+                await summary_q.put(i)
+                continue
             
             # Execute step 1: Download
             try:
                 logger.info(f"Downloading YouTube video: {url}")
-                audio_file_path = download_youtube_audio(url)
-                logger.info(f"Downloaded audio file: {audio_file_path}")
-                result["audio_file_path"] = audio_file_path
+                use_yt_dlp = True
+                if not keep_audio and not get_cached_audio(url):
+                    try:
+                        audio_in_memory[i] = await asyncio.to_thread(download_youtube_audio_bytes, url)
+                    except YtDlpNotInstalled:
+                        # Only the command line is missing; the file path can still use the yt_dlp package
+                        logger.warning("yt-dlp command line not found, downloading to a file instead")
+                    except Exception as e:
+                        # yt-dlp has already used up its retries, so go straight to pytube
+                        logger.warning(f"In-memory download failed ({str(e)}), downloading with pytube instead")
+                        use_yt_dlp = False
+                if i not in audio_in_memory:
+                    audio_file_path = await asyncio.to_thread(download_youtube_audio, url, use_yt_dlp=use_yt_dlp)
+                    logger.info(f"Downloaded audio file: {audio_file_path}")
+                    result["audio_file_path"] = audio_file_path
                 result["current_step"] = "transcription"
-                
-                # Execute step 2: Transcription with retry logic
-                logger.info(f"Transcribing audio file: {audio_file_path}")
-                def transcribe_with_retry():
-                    return transcribe_audio(audio_file_path)
-                
-                transcript_file, transcript_text = retry_with_backoff(
-                    transcribe_with_retry,
-                    max_retries=3,
-                    initial_delay=5,
-                    max_delay=60
-                )
+            except Exception as e:
+                _mark_failed(result, e)
+                continue
+            await transcribe_q.put(i)
+        await transcribe_q.put(None)
+    
+    async def transcriber_worker():
+        while (i := await transcribe_q.get()) is not None:
+            result = results[i]
+            audio_file_path = result["audio_file_path"]
+            
+            # Execute step 2: Transcription with retry logic
+            try:
+                if i in audio_in_memory:
+                    audio, file_name = audio_in_memory.pop(i)
+                    logger.info(f"Transcribing in-memory audio: {file_name}")
+                    transcript_file, transcript_text = await transcribe_with_retry(transcribe_bytes, audio, file_name)
+                else:
+                    logger.info(f"Transcribing audio file: {audio_file_path}")
+                    transcript_file, transcript_text = await transcribe_with_retry(transcribe_audio, audio_file_path)
                 
                 logger.info(f"Transcribed to: {transcript_file}")
                 result["transcript_file"] = transcript_file
                 result["transcript_text"] = transcript_text
                 result["current_step"] = "summarization"
-                
-                # Execute step 3: Summarization
-                logger.info(f"Summarizing transcript with prompt: {prompt}")
-                summary_file, summary = summarize_text(transcript_text, prompt)
-                logger.info(f"Generated summary: {summary_file}")
-                result["summary"] = summary
-                result["current_step"] = "end"
-                
             except Exception as e:
-                error_msg = f"Processing failed at step {result['current_step']}: {str(e)}"
-                logger.error(error_msg)
-                result["error"] = error_msg
-                result["current_step"] = "end"
+                _mark_failed(result, e)
+                continue
+            await summary_q.put(i)
+        await summary_q.put(None)
+    
+    async def summarize_batch(batch: List[int]):
+        # Execute step 3: Summarization, several transcripts per request
+        try:
+            logger.info(f"Summarizing {len(batch)} transcript(s) with prompt: {prompt}")
+            outputs = await summarize_with_retry(
+                [results[i]["transcript_text"] for i in batch],
+                prompt,
+                [results[i]["youtube_url"] for i in batch]
+            )
+        except Exception as e:
+            for i in batch:
+                _mark_failed(results[i], e)
+            return
         
-        # Add result to list
-        results.append(result)
-        logger.info(f"Completed processing URL: {url}")
+        for i, (summary_file, summary) in zip(batch, outputs):
+            logger.info(f"Generated summary: {summary_file}")
+            results[i]["summary"] = summary
+            results[i]["current_step"] = "end"
+            logger.info(f"Completed processing URL: {results[i]['youtube_url']}")
+    
+    async def summarize_with_batch_api(batch: List[int]):
+        # Execute step 3: Summarization, all transcripts in one Batch API job
+        try:
+            summaries = await asyncio.to_thread(
+                submit_summaries,
+                [{"text": results[i]["transcript_text"], "prompt_instruction": prompt, "youtube_url": results[i]["youtube_url"]} for i in batch]
+            )
+        except Exception as e:
+            for i in batch:
+                _mark_failed(results[i], e)
+            return
+        
+        for i, summary in zip(batch, summaries):
+            if summary is None:
+                _mark_failed(results[i], RuntimeError("Batch API request failed"))
+                continue
+            results[i]["summary"] = summary
+            results[i]["current_step"] = "end"
+            logger.info(f"Completed processing URL: {results[i]['youtube_url']}")
+    
+    async def summarizer_worker():
+        batch = []
+        if use_batch_api:
+            while (i := await summary_q.get()) is not None:
+                batch.append(i)
+            if batch:
+                await summarize_with_batch_api(batch)
+            return
+        while (i := await summary_q.get()) is not None:
+            batch.append(i)
+            if len(batch) >= batch_size:
+                await summarize_batch(batch)
+                batch = []
+        if batch:
+            await summarize_batch(batch)
+    
+    await asyncio.gather(producer(), downloader_worker(), transcriber_worker(), summarizer_worker())
         
     return results
 
+def process_youtube_urls(urls: List[str], prompt: str, use_mock: bool = False, queue_size: int = 2, batch_size: int = BATCH_SIZE, use_batch_api: bool = False, keep_audio: bool = False) -> List[Dict[str, Any]]:
+    """Synchronous wrapper around aprocess_youtube_urls."""
+    return run_with_client(aprocess_youtube_urls(urls, prompt, use_mock, queue_size, batch_size, use_batch_api, keep_audio))
+
 def display_results(results: List[Dict[str, Any]]) -> None:
     """Display processing results in a simple text format."""
     print(f"\nProcessed {len(results)} YouTube videos")
@@ -167,7 +318,7 @@ def display_results(results: List[Dict[str, Any]]) -> None:
     
     for i, result in enumerate(results):
         url = result["youtube_url"]
-        video_id = url.split("v=")[-1].split("&")[0] if "v=" in url else "unknown"
+        video_id = get_video_id(url, "unknown")
         
         print(f"\nVideo {i+1}: {video_id}")
         print(f"URL: {url}")
@@ -186,42 +337,57 @@ def display_results(results: List[Dict[str, Any]]) -> None:
 
 def save_results_to_csv(results: List[Dict[str, Any]], output_file: str = "batch_processing_results.csv") -> None:
     """Save basic processing results to a CSV file."""
-    df_results = []
-
-    for result in results:
-        # Create a simplified result for the DataFrame
-        df_result = {
-            "URL": result["youtube_url"],
-            "Success": len(result["error"]) == 0,
-            "Audio File": os.path.basename(result["audio_file_path"]) if result["audio_file_path"] else "",
-            "Transcript File": os.path.basename(result["transcript_file"]) if result["transcript_file"] else "",
-            "Summary Length": len(result["summary"]) if result["summary"] else 0,
-            "Error": result["error"][:100] + "..." if len(result["error"]) > 100 else result["error"]
-        }
-        df_results.append(df_result)
-
-    # Create and save DataFrame
-    df = pd.DataFrame(df_results)
-    df.to_csv(output_file, index=False)
+    fieldnames = ["URL", "Success", "Audio File", "Transcript File", "Summary Length", "Error"]
+
+    # Write everything through one large buffer, building each row as it is written
+    with open(output_file, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(
+            {
+                "URL": result["youtube_url"],
+                "Success": len(result["error"]) == 0,
+                "Audio File": os.path.basename(result["audio_file_path"]) if result["audio_file_path"] else "",
+                "Transcript File": os.path.basename(result["transcript_file"]) if result["transcript_file"] else "",
+                "Summary Length": len(result["summary"]) if result["summary"] else 0,
+                "Error": result["error"][:100] + "..." if len(result["error"]) > 100 else result["error"]
+            }
+            for result in results
+        )
     logger.info(f"Results saved to {output_file}")
 
 def save_detailed_summaries(results: List[Dict[str, Any]], output_file: str = "batch_processing_summaries.txt") -> None:
     """Save detailed summaries to a text file."""
-    with open(output_file, "w", encoding="utf-8") as f:
-        for i, result in enumerate(results):
-            f.write(f"\n{'=' * 50}\n")
-            f.write(f"Video {i+1}: {result['youtube_url']}\n")
-            f.write(f"{'=' * 50}\n\n")
-            
-            if result["error"]:
-                f.write(f"ERROR: {result['error']}\n")
-            else:
-                f.write(f"SUMMARY:\n{result['summary']}\n")
+    # Build the whole report in memory and write it once
+    buffer = io.StringIO()
+    for i, result in enumerate(results):
+        buffer.write(f"\n{'=' * 50}\n")
+        buffer.write(f"Video {i+1}: {result['youtube_url']}\n")
+        buffer.write(f"{'=' * 50}\n\n")
+        
+        if result["error"]:
+            buffer.write(f"ERROR: {result['error']}\n")
+        else:
+            buffer.write(f"SUMMARY:\n{result['summary']}\n")
+    
+    with open(output_file, "w", encoding="utf-8", buffering=1 << 20) as f:
+        f.write(buffer.getvalue())
     
     logger.info(f"Detailed summaries saved to {output_file}")
 
 def main():
     """Main function to run the batch processing."""
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(description="Batch YouTube Transcriber and Summarizer")
+    parser.add_argument("--batch-api", action="store_true", help="Summarize through the OpenAI Batch API (cheaper, may take up to 24h)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not reuse cached transcripts or read or write the summary cache")
+    parser.add_argument("--keep-audio", action="store_true", help="Save downloaded audio files in downloads/ instead of transcribing from memory")
+    
+    args = parser.parse_args()
+    
+    if args.no_cache:
+        disable_cache()
+    
     # List of YouTube URLs to process
     youtube_urls = [
         "https://www.youtube.com/watch?v=dQw4w9WgXcQ",  # Replace with your URLs
@@ -232,7 +398,7 @@ def main():
     prompt_instruction = "Summarize the key points and main ideas presented in this video. Include any important facts, arguments, or conclusions."
 
     # Process all URLs (set use_mock=True to test without downloading videos)
-    results = process_youtube_urls(youtube_urls, prompt_instruction, use_mock=False)
+    results = run_with_client(aprocess_youtube_urls(youtube_urls, prompt_instruction, use_mock=False, use_batch_api=args.batch_api, keep_audio=args.keep_audio))
 
     # Display the results
     display_results(results)
@@ -5,6 +5,7 @@ Check if all required dependencies are installed.
 import sys
 import subprocess
 import shutil
+from importlib.metadata import distribution, PackageNotFoundError
 
 def check_ffmpeg():
     """Check if FFmpeg is installed."""
@@ -25,17 +26,19 @@ def check_python_dependencies():
         "langchain",
         "langchain-openai",
         "python-dotenv",
-        "whisper",
+        "faster-whisper",
         "pydub",
         "ffmpeg-python"
     ]
     
     missing_packages = []
     
+    # Read installed distribution metadata instead of importing each package,
+    # which would execute its (often heavy) top-level code
     for package in required_packages:
         try:
-            __import__(package.replace("-", "_"))
-        except ImportError:
+            distribution(package)
+        except PackageNotFoundError:
             missing_packages.append(package)
     
     if missing_packages:
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from transcribe import create_youtube_processing_graph, AgentState
+from transcribe import process_youtube_urls
+from utils.clients import run_with_client
 from utils.logger import logger
 
 # Load environment variables
@@ -29,25 +32,16 @@ def transcribe_video(youtube_url: str, prompt: str, use_mock: bool = False) -> d
     print("Results will be saved in the downloads/, transcripts/, and summaries/ folders.")
     
     try:
-        # Create and run the LangGraph
-        graph = create_youtube_processing_graph()
+        # The graph's nodes are async, so it has to run on an event loop
+        coro = process_youtube_urls([youtube_url], prompt)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return run_with_client(coro)[0]
         
-        # Define the initial state
-        initial_state = {
-            "youtube_url": youtube_url,
-            "prompt_instruction": prompt,
-            "audio_file_path": "",
-            "transcript_text": "",
-            "transcript_file": "",
-            "summary": "",
-            "current_step": "download",  # Start with download step
-            "error": ""
-        }
-        
-        # Execute the graph
-        result = graph.invoke(initial_state)
-        
-        return result
+        # Jupyter already runs a loop in this thread, so run the graph on a new one in a worker
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(run_with_client, coro).result()[0]
         
     except Exception as e:
         error_msg = f"An error occurred: {str(e)}"
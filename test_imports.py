@@ -6,7 +6,7 @@ def test_imports():
         import langchain
         import langchain_openai
         from dotenv import load_dotenv
-        import whisper
+        import faster_whisper
         import pydub
         import ffmpeg
         print("All packages imported successfully!")
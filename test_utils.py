@@ -0,0 +1,163 @@
+import asyncio
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from utils import chunker, summarizer, throttle, youtube_downloader
+from utils.urls import get_video_id
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+class PlanChunksTest(unittest.TestCase):
+    def test_short_audio_is_one_chunk(self):
+        self.assertEqual(chunker.plan_chunks(300.0, [], 600), [(0.0, 300.0)])
+
+    def test_cuts_at_last_silence_in_second_half_of_window(self):
+        chunks = chunker.plan_chunks(1500.0, [100.0, 400.0, 550.0, 900.0, 1150.0], 600)
+        self.assertEqual(chunks, [(0.0, 550.0), (550.0, 1150.0), (1150.0, 1500.0)])
+
+    def test_hard_cut_without_silence(self):
+        chunks = chunker.plan_chunks(1300.0, [100.0], 600)
+        self.assertEqual(chunks, [(0.0, 600.0), (600.0, 1200.0), (1200.0, 1300.0)])
+
+    def test_chunks_cover_duration_without_gaps(self):
+        chunks = chunker.plan_chunks(3725.5, [290.0, 610.0, 1790.0, 2400.0, 3300.0], 600)
+        self.assertEqual(chunks[0][0], 0.0)
+        self.assertEqual(chunks[-1][1], 3725.5)
+        for (_, end), (start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(end, start)
+        for start, end in chunks:
+            self.assertLessEqual(end - start, 600)
+
+class GetVideoIdTest(unittest.TestCase):
+    def test_supported_url_forms(self):
+        urls = [
+            f"https://www.youtube.com/watch?v={VIDEO_ID}",
+            f"https://www.youtube.com/watch?feature=share&v={VIDEO_ID}&t=42",
+            f"https://m.youtube.com/watch?vi={VIDEO_ID}",
+            f"https://youtu.be/{VIDEO_ID}?t=10",
+            f"https://www.youtube.com/shorts/{VIDEO_ID}",
+            f"https://www.youtube.com/embed/{VIDEO_ID}?autoplay=1",
+            f"https://www.youtube.com/live/{VIDEO_ID}",
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(get_video_id(url), VIDEO_ID)
+
+    def test_junk_returns_default(self):
+        for url in ["", "not a url", "https://example.com/watch?v=short", "https://www.youtube.com/"]:
+            with self.subTest(url=url):
+                self.assertEqual(get_video_id(url), "unknown_video")
+        self.assertIsNone(get_video_id("https://example.com", default=None))
+
+class TokenBucketTest(unittest.TestCase):
+    def run_with_fake_clock(self, bucket, calls):
+        """Run acquire calls on a fake clock, returning the clock after each one."""
+        clock = [0.0]
+
+        async def fake_sleep(seconds):
+            clock[0] += seconds
+
+        async def main():
+            times = []
+            for requests, tokens in calls:
+                await bucket.acquire(requests, tokens)
+                times.append(clock[0])
+            return times
+
+        with mock.patch.object(throttle.time, "monotonic", lambda: clock[0]):
+            bucket.last_update = clock[0]
+            with mock.patch.object(throttle.asyncio, "sleep", fake_sleep):
+                return asyncio.run(main())
+
+    def test_paces_requests(self):
+        times = self.run_with_fake_clock(throttle.TokenBucket(60), [(1, 0)] * 62)
+        self.assertEqual(times[59], 0.0)
+        self.assertAlmostEqual(times[60], 1.0, places=1)
+        self.assertAlmostEqual(times[61], 2.0, places=1)
+
+    def test_paces_tokens(self):
+        times = self.run_with_fake_clock(throttle.TokenBucket(1000, 600), [(1, 600), (1, 300)])
+        self.assertEqual(times[0], 0.0)
+        self.assertAlmostEqual(times[1], 30.0, places=1)
+
+    def test_oversized_request_is_capped(self):
+        times = self.run_with_fake_clock(throttle.TokenBucket(1000, 100), [(1, 10_000)])
+        self.assertEqual(times, [0.0])
+
+    def test_zero_or_missing_limits_are_unlimited(self):
+        for rpm, tpm in [(0, 0), (None, None), (-1, None), (0, -5)]:
+            with self.subTest(rpm=rpm, tpm=tpm):
+                times = self.run_with_fake_clock(throttle.TokenBucket(rpm, tpm), [(1, 10_000)] * 5)
+                self.assertEqual(times, [0.0] * 5)
+
+class SummarizeTextBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+        patches = [
+            mock.patch.object(summarizer, "get_cached_summary", return_value=None),
+            mock.patch.object(summarizer, "set_cached_summary"),
+            mock.patch.object(summarizer, "count_tokens", lambda text, model=None: len(text) // 4),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def summarize(self, content, texts=("first transcript", "second transcript")):
+        response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+        urls = [f"https://youtu.be/{'a' * 11}", f"https://youtu.be/{'b' * 11}"]
+        with mock.patch.object(summarizer.openai.chat.completions, "create", return_value=response), \
+                mock.patch.object(summarizer, "summarize_text", side_effect=lambda text, *args, **kwargs: ("single", f"single: {text}")) as single:
+            results = summarizer.summarize_text_batch(list(texts), "Summarize", output_dir=self.output_dir, youtube_urls=urls)
+        return results, single
+
+    def test_splits_fenced_json(self):
+        results, single = self.summarize('```json\n["summary one", " summary two "]\n```')
+        self.assertEqual([summary for _, summary in results], ["summary one", "summary two"])
+        self.assertTrue(results[0][0].endswith(f"{'a' * 11}_summary.txt"))
+        self.assertTrue(results[1][0].endswith(f"{'b' * 11}_summary.txt"))
+        single.assert_not_called()
+
+    def test_splits_bare_json(self):
+        results, _ = self.summarize('["summary one", "summary two"]')
+        self.assertEqual([summary for _, summary in results], ["summary one", "summary two"])
+
+    def test_falls_back_when_response_cannot_be_split(self):
+        for content in ["Here are the summaries: one, two", '["only one"]', '{"1": "one", "2": "two"}']:
+            with self.subTest(content=content):
+                results, single = self.summarize(content)
+                self.assertEqual(results, [("single", "single: first transcript"), ("single", "single: second transcript")])
+                self.assertEqual(single.call_count, 2)
+
+class DownloadManyTest(unittest.TestCase):
+    def test_results_follow_input_order_and_duplicates_download_once(self):
+        calls = []
+
+        def fake_download(youtube_url, output_dir, max_retries):
+            calls.append(youtube_url)
+            video_id = get_video_id(youtube_url)
+            if video_id == "c" * 11:
+                raise youtube_downloader.DownloadFailed("unavailable")
+            return f"{output_dir}/{video_id}.m4a"
+
+        urls = [
+            f"https://youtu.be/{'b' * 11}",
+            f"https://www.youtube.com/watch?v={'a' * 11}",
+            f"https://youtu.be/{'c' * 11}",
+            f"https://www.youtube.com/shorts/{'b' * 11}",
+        ]
+        with tempfile.TemporaryDirectory() as output_dir, \
+                mock.patch.object(youtube_downloader, "download_youtube_audio", fake_download):
+            results = youtube_downloader.download_many(urls, output_dir, max_workers=3)
+
+        self.assertEqual(results[0], f"{output_dir}/{'b' * 11}.m4a")
+        self.assertEqual(results[1], f"{output_dir}/{'a' * 11}.m4a")
+        self.assertIsInstance(results[2], youtube_downloader.DownloadFailed)
+        self.assertEqual(results[3], results[0])
+        self.assertEqual(sorted(calls), sorted(urls[:3]))
+
+if __name__ == "__main__":
+    unittest.main()
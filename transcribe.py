@@ -1,4 +1,7 @@
 import os
+import enum
+import asyncio
+import weakref
 import argparse
 from typing import TypedDict, Annotated, List, Dict, Any
 from dotenv import load_dotenv
@@ -8,14 +11,45 @@ from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, END
 from pydantic import BaseModel, Field
 
-from utils.youtube_downloader import download_youtube_audio
-from utils.transcriber import transcribe_audio
-from utils.summarizer import summarize_text
+from utils.youtube_downloader import adownload_youtube_audio
+from utils.transcriber import atranscribe_audio
+from utils.summarizer import asummarize_text
+from utils.openai_batch import submit_summaries
+from utils.cache import disable_cache
+from utils.clients import run_with_client
 from utils.logger import logger
 
 # Load environment variables
 load_dotenv()
 
+class Step(str, enum.Enum):
+    """Pipeline steps, used both as graph node names and as current_step values."""
+    DOWNLOAD = "download"
+    TRANSCRIPTION = "transcription"
+    SUMMARIZATION = "summarization"
+    END = "end"
+    
+    def __str__(self):
+        return self.value
+
+# Cap concurrency per resource so stages of different videos overlap
+# without overloading the network, the transcriber or the LLM API
+STEP_CONCURRENCY = {Step.DOWNLOAD: 4, Step.TRANSCRIPTION: 2, Step.SUMMARIZATION: 8}
+
+# Semaphores belong to the event loop they are used on, so each loop (e.g.
+# each asyncio.run) gets its own set; entries disappear together with their loop
+_LOOP_SEMAPHORES = weakref.WeakKeyDictionary()
+
+def step_semaphore(step):
+    """Return the running event loop's semaphore capping concurrency of a step."""
+    loop = asyncio.get_running_loop()
+    semaphores = _LOOP_SEMAPHORES.get(loop)
+    if semaphores is None:
+        semaphores = _LOOP_SEMAPHORES[loop] = {
+            name: asyncio.Semaphore(limit) for name, limit in STEP_CONCURRENCY.items()
+        }
+    return semaphores[step]
+
 # Define our state
 class AgentState(TypedDict):
     youtube_url: str
@@ -28,196 +62,257 @@ class AgentState(TypedDict):
     error: str
 
 # Define our nodes (these replace Agents in CrewAI)
-def youtube_downloader(state: AgentState) -> AgentState:
+# Each node returns only the keys it changes; LangGraph merges them into the
+# state, so the transcript text is never copied between steps
+async def youtube_downloader(state: AgentState) -> Dict[str, Any]:
     """Download a YouTube video as audio."""
     logger.info(f"Downloading YouTube video: {state['youtube_url']}")
     
     try:
-        audio_file_path = download_youtube_audio(state["youtube_url"])
+        async with step_semaphore(Step.DOWNLOAD):
+            audio_file_path = await adownload_youtube_audio(state["youtube_url"])
         logger.info(f"Downloaded audio file: {audio_file_path}")
         
         return {
-            **state,
             "audio_file_path": audio_file_path,
-            "current_step": "transcription"
+            "current_step": Step.TRANSCRIPTION
         }
     except Exception as e:
         error_msg = f"Error downloading YouTube video: {str(e)}"
         logger.error(error_msg)
         return {
-            **state,
             "error": error_msg,
-            "current_step": "end"
+            "current_step": Step.END
         }
 
-def audio_transcriber(state: AgentState) -> AgentState:
+async def audio_transcriber(state: AgentState) -> Dict[str, Any]:
     """Transcribe an audio file to text."""
     logger.info(f"Transcribing audio file: {state['audio_file_path']}")
     
     try:
-        transcript_file, transcript_text = transcribe_audio(
-            state["audio_file_path"], 
-            youtube_url=state["youtube_url"]
-        )
+        async with step_semaphore(Step.TRANSCRIPTION):
+            transcript_file, transcript_text = await atranscribe_audio(
+                state["audio_file_path"], 
+                youtube_url=state["youtube_url"]
+            )
         logger.info(f"Transcribed to: {transcript_file}")
         
         return {
-            **state,
             "transcript_file": transcript_file,
             "transcript_text": transcript_text,
-            "current_step": "summarization"
+            "current_step": Step.SUMMARIZATION
         }
     except Exception as e:
         error_msg = f"Error transcribing audio: {str(e)}"
         logger.error(error_msg)
         return {
-            **state,
             "error": error_msg,
-            "current_step": "end"
+            "current_step": Step.END
         }
 
-def content_summarizer(state: AgentState) -> AgentState:
+async def content_summarizer(state: AgentState) -> Dict[str, Any]:
     """Summarize text based on a prompt."""
     logger.info(f"Summarizing transcript with prompt: {state['prompt_instruction']}")
     
     try:
-        summary_file, summary = summarize_text(
-            state["transcript_text"], 
-            state["prompt_instruction"],
-            youtube_url=state["youtube_url"]
-        )
+        async with step_semaphore(Step.SUMMARIZATION):
+            summary_file, summary = await asummarize_text(
+                state["transcript_text"], 
+                state["prompt_instruction"],
+                youtube_url=state["youtube_url"]
+            )
         logger.info(f"Generated summary: {summary_file}")
         
         return {
-            **state,
             "summary": summary,
-            "current_step": "end"
+            "current_step": Step.END
         }
     except Exception as e:
         error_msg = f"Error summarizing transcript: {str(e)}"
         logger.error(error_msg)
         return {
-            **state,
             "error": error_msg,
-            "current_step": "end"
+            "current_step": Step.END
         }
 
 # Define our route logic
 def router(state: AgentState) -> str:
-    """Route to the next step in the pipeline based on the current step."""
-    # If there's an error, we should end the process
-    if "error" in state and state["error"]:
-        return "end"
-    return state["current_step"]
+    """Route to the next step in the pipeline, or end on an error."""
+    return Step.END if state.get("error") else state["current_step"]
 
 # Create the LangGraph workflow
-def create_youtube_processing_graph():
-    """Create a graph for processing YouTube videos."""
+def create_youtube_processing_graph(include_summarization=True):
+    """
+    Create a graph for processing YouTube videos.
+    
+    Args:
+        include_summarization (bool): Whether to summarize in the graph, or stop
+            after transcription so summaries can be requested in one batch
+    """
     # Create the workflow graph
     workflow = StateGraph(AgentState)
     
     # Add our nodes
-    workflow.add_node("download", youtube_downloader)
-    workflow.add_node("transcription", audio_transcriber)
-    workflow.add_node("summarization", content_summarizer)
-    
-    # Add our edges
-    workflow.add_conditional_edges(
-        "download",
-        router,
-        {
-            "transcription": "transcription",
-            "end": END
-        }
-    )
+    workflow.add_node(Step.DOWNLOAD, youtube_downloader)
+    workflow.add_node(Step.TRANSCRIPTION, audio_transcriber)
+    if include_summarization:
+        workflow.add_node(Step.SUMMARIZATION, content_summarizer)
     
+    # Add our edges; only steps that can fail before the last one need the router
     workflow.add_conditional_edges(
-        "transcription",
+        Step.DOWNLOAD,
         router,
         {
-            "summarization": "summarization",
-            "end": END
+            Step.TRANSCRIPTION: Step.TRANSCRIPTION,
+            Step.END: END
         }
     )
     
-    workflow.add_conditional_edges(
-        "summarization",
-        router,
-        {
-            "end": END
-        }
-    )
+    if include_summarization:
+        workflow.add_conditional_edges(
+            Step.TRANSCRIPTION,
+            router,
+            {
+                Step.SUMMARIZATION: Step.SUMMARIZATION,
+                Step.END: END
+            }
+        )
+        workflow.add_edge(Step.SUMMARIZATION, END)
+    else:
+        workflow.add_edge(Step.TRANSCRIPTION, END)
     
     # Set the entry point
-    workflow.set_entry_point("download")
+    workflow.set_entry_point(Step.DOWNLOAD)
     
     return workflow.compile()
 
-def handle_mock_data(args):
-    """Use mock data if the --mock flag is provided."""
-    if args.mock:
-        logger.info("Using mock data for demonstration")
-        # Return a mock state with data
-        return {
-            "youtube_url": args.youtube_url,
-            "prompt_instruction": args.prompt,
-            "audio_file_path": "mock_audio.mp3",
-            "transcript_text": "This is a mock transcript of a YouTube video about technology and innovation.",
-            "transcript_file": "mock_transcript.txt",
-            "summary": "This is a mock summary of the video. The main points discussed include technology, innovation, and the future of AI.",
-            "current_step": "end",
+def create_mock_state(youtube_url, prompt):
+    """Return a mock final state for demonstration (--mock)."""
+    return {
+        "youtube_url": youtube_url,
+        "prompt_instruction": prompt,
+        "audio_file_path": "mock_audio.mp3",
+        "transcript_text": "This is a mock transcript of a YouTube video about technology and innovation.",
+        "transcript_file": "mock_transcript.txt",
+        "summary": "This is a mock summary of the video. The main points discussed include technology, innovation, and the future of AI.",
+        "current_step": Step.END,
+        "error": ""
+    }
+
+async def summarize_with_batch_api(states, prompt):
+    """
+    Summarize all transcribed videos in one OpenAI Batch API job.
+    
+    Args:
+        states (list): Final graph states from a run without summarization
+        prompt (str): Prompt instruction for summarization
+    
+    Returns:
+        list: The states with their summary or error filled in
+    """
+    pending = [state for state in states if not state["error"]]
+    if not pending:
+        return states
+    
+    try:
+        summaries = await asyncio.to_thread(
+            submit_summaries,
+            [{"text": state["transcript_text"], "prompt_instruction": prompt, "youtube_url": state["youtube_url"]} for state in pending]
+        )
+    except Exception as e:
+        error_msg = f"Error summarizing transcript: {str(e)}"
+        logger.error(error_msg)
+        summaries = [None] * len(pending)
+    else:
+        error_msg = "Error summarizing transcript: Batch API request failed"
+    
+    for state, summary in zip(pending, summaries):
+        if summary is None:
+            state["error"] = error_msg
+        else:
+            state["summary"] = summary
+        state["current_step"] = Step.END
+    return states
+
+async def process_youtube_urls(youtube_urls, prompt, use_batch_api=False):
+    """
+    Run the graph for several videos concurrently.
+    
+    Each video runs through its own graph invocation, so one video's
+    summarization overlaps the next one's transcription and download.
+    
+    Args:
+        youtube_urls (list): URLs of the YouTube videos to process
+        prompt (str): Prompt instruction for summarization
+        use_batch_api (bool): Summarize through one OpenAI Batch API job after
+            all videos are transcribed, at lower cost but up to 24h latency
+    
+    Returns:
+        list: Final state for each video, in input order
+    """
+    graph = create_youtube_processing_graph(include_summarization=not use_batch_api)
+    
+    initial_states = [
+        {
+            "youtube_url": youtube_url,
+            "prompt_instruction": prompt,
+            "audio_file_path": "",
+            "transcript_text": "",
+            "transcript_file": "",
+            "summary": "",
+            "current_step": Step.DOWNLOAD,  # Start with download step
             "error": ""
         }
-    return None
+        for youtube_url in youtube_urls
+    ]
+    
+    results = await asyncio.gather(*(graph.ainvoke(state) for state in initial_states))
+    
+    if use_batch_api:
+        results = await summarize_with_batch_api(results, prompt)
+    return results
 
 def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="YouTube Transcriber and Summarizer")
-    parser.add_argument("youtube_url", help="URL of the YouTube video to process")
+    parser.add_argument("youtube_urls", nargs="+", help="URL(s) of the YouTube video(s) to process")
     parser.add_argument("prompt", help="Prompt instruction for summarization")
     parser.add_argument("--mock", action="store_true", help="Use mock data for demonstration")
+    parser.add_argument("--batch", action="store_true", help="Summarize multiple videos through the OpenAI Batch API (cheaper, up to 24h)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not reuse cached transcripts or read or write the summary cache")
     
     args = parser.parse_args()
     
+    if args.no_cache:
+        disable_cache()
+    
     # Check if we should use mock data
-    mock_result = handle_mock_data(args)
-    if mock_result:
-        print("\n" + "="*50)
-        print("SUMMARY (MOCK DATA)")
-        print("="*50)
-        print(mock_result["summary"])
-        print("="*50)
+    if args.mock:
+        logger.info("Using mock data for demonstration")
+        for youtube_url in args.youtube_urls:
+            print("\n" + "="*50)
+            print("SUMMARY (MOCK DATA)")
+            print("="*50)
+            print(create_mock_state(youtube_url, args.prompt)["summary"])
+            print("="*50)
         return
     
-    # Create and run the LangGraph
-    graph = create_youtube_processing_graph()
-    
-    # Define the initial state
-    initial_state = {
-        "youtube_url": args.youtube_url,
-        "prompt_instruction": args.prompt,
-        "audio_file_path": "",
-        "transcript_text": "",
-        "transcript_file": "",
-        "summary": "",
-        "current_step": "download",  # Start with download step
-        "error": ""
-    }
-    
-    # Execute the graph
-    result = graph.invoke(initial_state)
+    # Execute the graph for every URL
+    use_batch_api = args.batch and len(args.youtube_urls) > 1
+    results = run_with_client(process_youtube_urls(args.youtube_urls, args.prompt, use_batch_api))
     
-    # Print the summary or error
-    print("\n" + "="*50)
-    if result.get("error"):
-        print("ERROR")
-        print("="*50)
-        print(result["error"])
-    else:
-        print("SUMMARY")
+    # Print the summary or error for each video
+    for result in results:
+        print("\n" + "="*50)
+        if result.get("error"):
+            print(f"ERROR: {result['youtube_url']}")
+            print("="*50)
+            print(result["error"])
+        else:
+            print(f"SUMMARY: {result['youtube_url']}")
+            print("="*50)
+            print(result.get("summary", "No summary generated"))
         print("="*50)
-        print(result.get("summary", "No summary generated"))
-    print("="*50)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
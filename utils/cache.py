@@ -0,0 +1,79 @@
+import os
+import sqlite3
+import hashlib
+from contextlib import closing
+from .logger import logger
+
+# Location of the summary cache database
+CACHE_DB_PATH = os.path.join("cache", "summaries.db")
+
+_cache_enabled = True
+
+def disable_cache():
+    """Turn off cache lookups and writes for this process (e.g. --no-cache)."""
+    global _cache_enabled
+    _cache_enabled = False
+
+def is_cache_enabled():
+    """Return whether the cache is enabled."""
+    return _cache_enabled
+
+def sha256_text(text):
+    """Return the hex SHA-256 digest of a string."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _connect():
+    """Open the cache database, creating it on first use."""
+    os.makedirs(os.path.dirname(CACHE_DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(CACHE_DB_PATH)
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS summaries (
+            prompt_hash TEXT NOT NULL,
+            text_hash TEXT NOT NULL,
+            model TEXT NOT NULL,
+            summary TEXT NOT NULL,
+            PRIMARY KEY (prompt_hash, text_hash, model)
+        )"""
+    )
+    return conn
+
+def get_cached_summary(text, prompt_instruction, model):
+    """
+    Look up a cached summary for a transcript, prompt and model.
+
+    Args:
+        text (str): Transcript text
+        prompt_instruction (str): Instructions used for summarization
+        model (str): Model that produced the summary
+
+    Returns:
+        str: The cached summary, or None on a miss or when caching is disabled
+    """
+    if not _cache_enabled:
+        return None
+
+    try:
+        with closing(_connect()) as conn:
+            row = conn.execute(
+                "SELECT summary FROM summaries WHERE prompt_hash = ? AND text_hash = ? AND model = ?",
+                (sha256_text(prompt_instruction), sha256_text(text), model)
+            ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning(f"Summary cache lookup failed: {str(e)}")
+        return None
+
+    return row[0] if row else None
+
+def set_cached_summary(text, prompt_instruction, model, summary):
+    """Store a summary for a transcript, prompt and model."""
+    if not _cache_enabled:
+        return
+
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summaries (prompt_hash, text_hash, model, summary) VALUES (?, ?, ?, ?)",
+                (sha256_text(prompt_instruction), sha256_text(text), model, summary)
+            )
+    except sqlite3.Error as e:
+        logger.warning(f"Summary cache write failed: {str(e)}")
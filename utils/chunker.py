@@ -0,0 +1,94 @@
+import os
+import re
+import subprocess
+from .logger import logger
+
+_SILENCE_RE = re.compile(r"silence_(start|end): (-?[\d.]+)")
+
+def get_duration(audio_file_path):
+    """Return the duration of an audio file in seconds, using ffprobe."""
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+         "-of", "default=noprint_wrappers=1:nokey=1", audio_file_path],
+        capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip())
+
+def find_silences(audio_file_path, noise_db=-30, min_silence_s=0.5):
+    """
+    Detect silent stretches with ffmpeg's silencedetect filter.
+
+    Returns:
+        list: Midpoints in seconds of each silent stretch
+    """
+    result = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-nostats", "-i", audio_file_path,
+         "-af", f"silencedetect=noise={noise_db}dB:d={min_silence_s}", "-f", "null", "-"],
+        capture_output=True, text=True
+    )
+
+    midpoints = []
+    start = None
+    for kind, value in _SILENCE_RE.findall(result.stderr):
+        if kind == "start":
+            start = float(value)
+        elif start is not None:
+            midpoints.append((start + float(value)) / 2)
+            start = None
+    return midpoints
+
+def plan_chunks(duration, silences, chunk_s):
+    """
+    Choose chunk boundaries at most chunk_s apart, cutting in silence where possible.
+
+    Each cut is placed at the last silence before the chunk would exceed
+    chunk_s, so words are not split; without one it falls back to a hard cut.
+
+    Returns:
+        list: (start, end) tuples in seconds covering the whole duration
+    """
+    chunks = []
+    start = 0.0
+    while duration - start > chunk_s:
+        limit = start + chunk_s
+        # Prefer a silence in the second half of the window so chunks stay reasonably long
+        candidates = [s for s in silences if start + chunk_s / 2 < s <= limit]
+        end = candidates[-1] if candidates else limit
+        chunks.append((start, end))
+        start = end
+    chunks.append((start, duration))
+    return chunks
+
+def split_audio(audio_file_path, chunk_s, output_dir):
+    """
+    Split an audio file into chunks of at most chunk_s seconds, cut at silences.
+
+    Chunks are stream-copied (no re-encoding) and named after the source file
+    with a part number, so re-runs produce the same names.
+
+    Args:
+        audio_file_path (str): Path to the audio file
+        chunk_s (float): Maximum chunk length in seconds
+        output_dir (str): Directory to write the chunk files to
+
+    Returns:
+        list: (start, end, chunk_path) tuples in time order
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    base, ext = os.path.splitext(os.path.basename(audio_file_path))
+
+    duration = get_duration(audio_file_path)
+    plan = plan_chunks(duration, find_silences(audio_file_path), chunk_s)
+    logger.info(f"Splitting {audio_file_path} ({duration:.0f}s) into {len(plan)} chunks")
+
+    chunks = []
+    for i, (start, end) in enumerate(plan):
+        chunk_path = os.path.join(output_dir, f"{base}_part{i:03d}{ext}")
+        subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+             "-ss", f"{start:.3f}", "-i", audio_file_path, "-t", f"{end - start:.3f}",
+             "-c", "copy", chunk_path],
+            check=True
+        )
+        chunks.append((start, end, chunk_path))
+    return chunks
@@ -0,0 +1,74 @@
+import asyncio
+import weakref
+import importlib.util
+import openai
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Upper bound on concurrent requests through the shared client
+MAX_CONNECTIONS = 64
+
+# One client per event loop: httpx pools connections on the loop that opened
+# them, so a client must not outlive its loop (e.g. across asyncio.run calls).
+# Entries disappear together with their loop; run_with_client closes the
+# client's connections before the loop ends.
+_CLIENTS = weakref.WeakKeyDictionary()
+
+def _create_async_client():
+    import httpx
+    return openai.AsyncOpenAI(http_client=httpx.AsyncClient(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_CONNECTIONS,
+            keepalive_expiry=60
+        ),
+        # Long uploads and transcriptions need a generous read timeout, but a
+        # dead host should fail fast
+        timeout=httpx.Timeout(600, connect=10)
+    ))
+
+def get_async_client():
+    """
+    Return the AsyncOpenAI client shared by transcription and summarization
+    within the running event loop.
+    
+    Its connection pool is sized for the concurrent requests of the async
+    pipeline, and idle connections are kept alive long enough to be reused
+    between videos instead of paying a new TLS handshake. When the h2 package
+    is installed, requests are multiplexed over HTTP/2 connections.
+    """
+    loop = asyncio.get_running_loop()
+    client = _CLIENTS.get(loop)
+    if client is None:
+        client = _CLIENTS[loop] = _create_async_client()
+    return client
+
+async def aclose_async_client():
+    """Close the running event loop's client, if one was created, and forget it."""
+    client = _CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+def run_with_client(coro):
+    """
+    Run a coroutine with asyncio.run, closing the loop's AsyncOpenAI client
+    before the loop ends.
+    
+    A client left open when its loop is collected keeps its pooled sockets
+    open and triggers unclosed-client ResourceWarnings.
+    
+    Args:
+        coro: Coroutine to run, e.g. a pipeline entry point
+    
+    Returns:
+        The coroutine's result
+    """
+    async def main():
+        try:
+            return await coro
+        finally:
+            await aclose_async_client()
+    return asyncio.run(main())
@@ -7,7 +7,13 @@ def setup_logger():
     """
     Set up logging configuration with both console and file output.
     Logs will be saved in the logs directory with rotation.
+    
+    Safe to call more than once: if the root logger already has handlers,
+    the existing configuration is kept.
     """
+    if logging.getLogger().handlers:
+        return logging.getLogger(__name__)
+    
     # Create logs directory if it doesn't exist
     os.makedirs('logs', exist_ok=True)
     
@@ -26,7 +32,8 @@ def setup_logger():
                 f'logs/transcriber_{timestamp}.log',
                 maxBytes=10*1024*1024,  # 10MB
                 backupCount=5,
-                encoding='utf-8'
+                encoding='utf-8',
+                delay=True  # Open the file on the first write
             )
         ]
     )
@@ -0,0 +1,109 @@
+import os
+import io
+import json
+import time
+import hashlib
+import openai
+from dotenv import load_dotenv
+try:
+    import orjson
+except ImportError:
+    orjson = None
+from .logger import logger
+from .summarizer import build_summary_request, get_summary_file_path
+from .cache import set_cached_summary
+
+# Load environment variables
+load_dotenv()
+
+def _custom_id(item, index):
+    """Build a stable custom_id for a batch request line."""
+    key = item.get("youtube_url") or str(index)
+    return f"{index}-{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}"
+
+def _dumps_line(obj):
+    """Serialize one JSONL line to bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj) + b"\n"
+    return (json.dumps(obj) + "\n").encode("utf-8")
+
+def submit_summaries(items, output_dir="summaries", poll_interval=5, max_poll_interval=300):
+    """
+    Summarize transcripts through the OpenAI Batch API.
+
+    Batch jobs are billed at a lower rate and use a separate rate-limit pool,
+    but may take up to 24 hours to complete, so this suits large offline runs.
+
+    Args:
+        items (list): Dicts with "text" and "prompt_instruction" keys and an
+            optional "youtube_url"
+        output_dir (str): Directory to save the summaries
+        poll_interval (int): Initial seconds to wait between status checks
+        max_poll_interval (int): Maximum seconds to wait between status checks
+
+    Returns:
+        list: Summary text for each item in input order, or None for items
+            whose request failed
+    """
+    model = os.getenv('SUMMARY_MODEL', 'gpt-4o-mini')
+    custom_ids = [_custom_id(item, i) for i, item in enumerate(items)]
+
+    # Build the JSONL input, one chat completion request per line
+    payload = io.BytesIO(b"".join(
+        _dumps_line({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": build_summary_request(item["text"], item["prompt_instruction"])
+        })
+        for custom_id, item in zip(custom_ids, items)
+    ))
+
+    logger.info(f"Submitting {len(items)} summarization requests to the OpenAI Batch API")
+    input_file = openai.files.create(file=("summaries.jsonl", payload), purpose="batch")
+    batch = openai.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+
+    # Poll with exponential backoff until the batch finishes
+    delay = poll_interval
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        logger.info(f"Batch {batch.id} is {batch.status}, checking again in {delay} seconds...")
+        time.sleep(delay)
+        delay = min(delay * 2, max_poll_interval)
+        batch = openai.batches.retrieve(batch.id)
+
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+
+    # Parse the output JSONL keyed by custom_id
+    summaries = {}
+    if batch.output_file_id:
+        output = openai.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            record = orjson.loads(line) if orjson is not None else json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                logger.error(f"Batch request {record.get('custom_id')} failed: {record.get('error') or response}")
+                continue
+            content = response["body"]["choices"][0]["message"]["content"]
+            summaries[record["custom_id"]] = content.strip()
+
+    logger.info(f"Batch {batch.id} completed with {len(summaries)}/{len(items)} summaries")
+    
+    # Save each summary where summarize_text would have, and cache it
+    os.makedirs(output_dir, exist_ok=True)
+    for custom_id, item in zip(custom_ids, items):
+        summary = summaries.get(custom_id)
+        if summary is None:
+            continue
+        summary_file = get_summary_file_path(output_dir, item.get("youtube_url"), item["prompt_instruction"])
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            f.write(summary)
+        set_cached_summary(item["text"], item["prompt_instruction"], model, summary)
+    
+    return [summaries.get(custom_id) for custom_id in custom_ids]
@@ -0,0 +1,84 @@
+import time
+import asyncio
+import functools
+
+def estimate_tokens(text, max_tokens=0):
+    """Roughly estimate the tokens a request will consume (about 4 chars per token)."""
+    return len(text) // 4 + max_tokens
+
+class TokenBucket:
+    """
+    Proactive rate limiter for requests-per-minute and tokens-per-minute limits.
+
+    Capacity refills continuously, and acquire() waits until enough is
+    available before a call is issued, so calls stay under the limits instead
+    of reacting to rate-limit errors after the fact.
+    """
+
+    def __init__(self, rpm, tpm=None):
+        """
+        Args:
+            rpm (int): Requests allowed per minute, None or 0 for no request limit
+            tpm (int, optional): Tokens allowed per minute, None or 0 for no token limit
+        """
+        # Treat a missing, zero or negative limit as unlimited rather than dividing by it
+        self.rpm = rpm if rpm and rpm > 0 else None
+        self.tpm = tpm if tpm and tpm > 0 else None
+        self.available_requests = self.rpm or 0
+        self.available_tokens = self.tpm or 0
+        self.last_update = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.last_update
+        self.last_update = now
+        if self.rpm:
+            self.available_requests = min(self.rpm, self.available_requests + self.rpm * elapsed / 60)
+        if self.tpm:
+            self.available_tokens = min(self.tpm, self.available_tokens + self.tpm * elapsed / 60)
+
+    async def acquire(self, requests=1, tokens=0):
+        """Wait until the requested capacity is available, then consume it."""
+        # A single request larger than the whole budget can never fit, so cap it
+        requests = min(requests, self.rpm) if self.rpm else 0
+        tokens = min(tokens, self.tpm) if self.tpm else 0
+
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.available_requests >= requests and self.available_tokens >= tokens:
+                    self.available_requests -= requests
+                    self.available_tokens -= tokens
+                    return
+
+                # Sleep just long enough for the scarcer resource to refill
+                wait_time = 0
+                if self.rpm:
+                    wait_time = (requests - self.available_requests) * 60 / self.rpm
+                if self.tpm:
+                    wait_time = max(wait_time, (tokens - self.available_tokens) * 60 / self.tpm)
+                await asyncio.sleep(max(wait_time, 0.01))
+
+def throttled(bucket, token_estimator=None):
+    """
+    Turn a blocking function into a coroutine that waits on a TokenBucket.
+
+    The wrapped call runs on the default thread pool once capacity is available.
+
+    Args:
+        bucket (TokenBucket): Limiter shared by all calls of this kind
+        token_estimator (callable, optional): Receives the call arguments and
+            returns the estimated tokens for the request
+
+    Returns:
+        callable: Decorator producing the throttled coroutine function
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            tokens = token_estimator(*args, **kwargs) if token_estimator else 0
+            await bucket.acquire(1, tokens)
+            return await asyncio.to_thread(func, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,21 +1,347 @@
 import os
+import io
+import re
+import hashlib
 import time
+import asyncio
+import functools
+import threading
 import subprocess
+import tempfile
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import openai
 from dotenv import load_dotenv
 from .logger import logger
+from .cache import is_cache_enabled
+from .clients import get_async_client, run_with_client
+from .urls import get_video_id
+from .chunker import get_duration, split_audio
 
 # Load environment variables
 load_dotenv()
 
-def transcribe_audio(audio_file_path, output_dir="transcripts", youtube_url=None):
+# Transcription backend: "openai" (Whisper API) or "faster-whisper" (local, int8 CTranslate2)
+TRANSCRIBER_BACKEND = os.getenv('TRANSCRIBER_BACKEND', 'openai')
+WHISPER_MODEL = os.getenv('WHISPER_MODEL', 'base')
+# Empty means auto-detect: int8_float16 on CUDA, int8 on CPU
+WHISPER_DEVICE = os.getenv('WHISPER_DEVICE', '')
+WHISPER_COMPUTE_TYPE = os.getenv('WHISPER_COMPUTE_TYPE', '')
+# Speech chunks of one file decoded together by the local model; 1 disables batching
+WHISPER_BATCH_SIZE = int(os.getenv('WHISPER_BATCH_SIZE', '8'))
+
+# The API backend transcribes longer audio in chunks of at most this many
+# seconds, in parallel; this also keeps each upload under the 25 MB API limit
+CHUNK_SECONDS = int(os.getenv('TRANSCRIBE_CHUNK_SECONDS', '600'))
+CHUNK_CONCURRENCY = 8
+
+# In-memory audio smaller than this is shorter than CHUNK_SECONDS even at
+# YouTube's lowest common audio bitrate (about 48 kbps), so it skips the
+# duration probe; larger payloads are spooled to disk to be probed and split
+CHUNK_PROBE_BYTES = CHUNK_SECONDS * 48_000 // 8
+
+_MODEL_LOCK = threading.Lock()
+
+@functools.lru_cache(maxsize=None)
+def _load_local_model(size, device, compute_type):
+    """Load a faster-whisper model, once per size, device and compute type."""
+    # Imported here so the API backend does not need faster-whisper installed
+    import ctranslate2
+    from faster_whisper import WhisperModel
+    
+    device = device or ("cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu")
+    compute_type = compute_type or ("int8_float16" if device == "cuda" else "int8")
+    logger.info(f"Loading faster-whisper model '{size}' on {device} ({compute_type})")
+    return WhisperModel(size, device=device, compute_type=compute_type)
+
+def get_local_model(size=WHISPER_MODEL):
+    """Return the shared faster-whisper model, loading it on first use."""
+    with _MODEL_LOCK:
+        return _load_local_model(size, WHISPER_DEVICE, WHISPER_COMPUTE_TYPE)
+
+@functools.lru_cache(maxsize=None)
+def _get_batched_pipeline(model):
+    """Wrap a loaded model in faster-whisper's batched pipeline, once per model."""
+    from faster_whisper import BatchedInferencePipeline
+    return BatchedInferencePipeline(model=model)
+
+def _transcribe_locally(audio):
+    """Transcribe a path or binary file object with faster-whisper, skipping silence."""
+    model = get_local_model()
+    if WHISPER_BATCH_SIZE > 1:
+        # VAD splits the audio into speech chunks that go through the model in batches
+        segments, info = _get_batched_pipeline(model).transcribe(
+            audio, batch_size=WHISPER_BATCH_SIZE, vad_filter=True, beam_size=1
+        )
+    else:
+        segments, info = model.transcribe(audio, vad_filter=True, beam_size=1)
+    return "".join(segment.text for segment in segments).strip()
+
+# Background pool for warm-up work that should overlap with downloads
+EXECUTOR = ThreadPoolExecutor(max_workers=2)
+_warmup_future = None
+
+def _preconnect():
+    """Create the OpenAI client and open a connection with a cheap request."""
+    try:
+        openai.models.list()
+        logger.info("OpenAI client warmed up")
+    except Exception as e:
+        logger.warning(f"OpenAI client warm-up failed: {str(e)}")
+
+def warm_up_transcriber():
+    """
+    Start warming up the transcription client in the background.
+    
+    Call this before the first download so that client construction, DNS and
+    TLS setup (or loading the faster-whisper model, with the local backend)
+    happen while yt-dlp is busy rather than on the first transcription.
+    Calling it again returns the same future.
+    
+    Returns:
+        Future: Completes when the warm-up has finished
+    """
+    global _warmup_future
+    if _warmup_future is None:
+        warm_up = get_local_model if TRANSCRIBER_BACKEND == "faster-whisper" else _preconnect
+        _warmup_future = EXECUTOR.submit(warm_up)
+    return _warmup_future
+
+def get_cached_transcript(transcript_file):
+    """
+    Return a transcript saved by an earlier run, if any.
+    
+    Args:
+        transcript_file (str): Path where the transcript would have been saved
+    
+    Returns:
+        tuple: (transcript_file_path, transcribed_text), or None if there is no
+            non-empty transcript at that path or caching is disabled (--no-cache)
+    """
+    if not is_cache_enabled():
+        return None
+    
+    # Open directly instead of checking for the file first
+    try:
+        with open(transcript_file, 'r', encoding='utf-8') as f:
+            transcript_text = f.read()
+    except FileNotFoundError:
+        return None
+    if not transcript_text:
+        return None
+    
+    logger.info(f"Transcript already exists: {transcript_file}")
+    return transcript_file, transcript_text
+
+def _needs_chunking(audio_file_path):
+    """Return whether audio is long enough to be transcribed in chunks."""
+    try:
+        return get_duration(audio_file_path) > CHUNK_SECONDS
+    except (OSError, subprocess.CalledProcessError, ValueError) as e:
+        logger.warning(f"Could not read the duration of {audio_file_path} ({str(e)}), transcribing in one request")
+        return False
+
+def _transcribe_request(audio_file_path):
+    """Transcribe an audio file with a single OpenAI API request."""
+    with open(audio_file_path, "rb") as audio_file:
+        transcript = openai.audio.transcriptions.create(
+            model="whisper-1",
+            file=audio_file
+        )
+    return transcript.text
+
+async def _atranscribe_request(audio_file_path):
+    """Async version of _transcribe_request, on the shared AsyncOpenAI client."""
+    with open(audio_file_path, "rb") as audio_file:
+        transcript = await get_async_client().audio.transcriptions.create(
+            model="whisper-1",
+            file=audio_file
+        )
+    return transcript.text
+
+def _part_transcript_file(parts_dir, digest, start, end):
+    """Name a chunk transcript after the source audio's digest and the chunk's bounds."""
+    return os.path.join(parts_dir, f"{digest}_{start:.3f}-{end:.3f}.txt")
+
+def _transcribe_in_chunks(audio_file_path, output_dir, digest, before_request=None):
+    """
+    Split long audio at silences and transcribe the chunks in parallel.
+    
+    Chunk transcripts are kept in output_dir/parts, keyed by the source
+    audio's digest and the chunk's bounds, so a retry only transcribes the
+    chunks that did not finish, while other audio or a changed chunk plan
+    never reuses them. before_request, if given, is called before each
+    chunk's API request.
+    """
+    parts_dir = os.path.join(output_dir, "parts")
+    os.makedirs(parts_dir, exist_ok=True)
+    
+    def transcribe_part(chunk):
+        start, end, chunk_path = chunk
+        part_file = _part_transcript_file(parts_dir, digest, start, end)
+        cached = get_cached_transcript(part_file)
+        if cached:
+            return cached[1]
+        
+        if before_request:
+            before_request()
+        text = _transcribe_request(chunk_path)
+        Path(part_file).write_text(text, encoding='utf-8')
+        return text
+    
+    with tempfile.TemporaryDirectory() as chunk_dir:
+        chunks = split_audio(audio_file_path, CHUNK_SECONDS, chunk_dir)
+        with ThreadPoolExecutor(max_workers=CHUNK_CONCURRENCY) as executor:
+            texts = list(executor.map(transcribe_part, chunks))
+    return " ".join(text.strip() for text in texts)
+
+async def _atranscribe_in_chunks(audio_file_path, output_dir, digest):
+    """Async version of _transcribe_in_chunks."""
+    parts_dir = os.path.join(output_dir, "parts")
+    os.makedirs(parts_dir, exist_ok=True)
+    semaphore = asyncio.Semaphore(CHUNK_CONCURRENCY)
+    
+    async def transcribe_part(start, end, chunk_path):
+        part_file = _part_transcript_file(parts_dir, digest, start, end)
+        cached = get_cached_transcript(part_file)
+        if cached:
+            return cached[1]
+        
+        async with semaphore:
+            text = await _atranscribe_request(chunk_path)
+        Path(part_file).write_text(text, encoding='utf-8')
+        return text
+    
+    with tempfile.TemporaryDirectory() as chunk_dir:
+        chunks = await asyncio.to_thread(split_audio, audio_file_path, CHUNK_SECONDS, chunk_dir)
+        texts = await asyncio.gather(*(transcribe_part(*chunk) for chunk in chunks))
+    return " ".join(text.strip() for text in texts)
+
+def _asr_model_tag():
+    """Identify the backend and model, so cached transcripts are not shared between them."""
+    if TRANSCRIBER_BACKEND == "faster-whisper":
+        return f"faster-whisper:{WHISPER_MODEL}"
+    return "openai:whisper-1"
+
+def audio_digest(audio):
+    """
+    Hash audio content together with the transcription model.
+    
+    Args:
+        audio: Path to an audio file, or the encoded audio bytes
+    
+    Returns:
+        str: Hex digest used as the content cache key
+    """
+    h = hashlib.blake2b(_asr_model_tag().encode("utf-8"), digest_size=16)
+    if isinstance(audio, bytes):
+        h.update(audio)
+    else:
+        with open(audio, "rb") as f:
+            # Python 3.11+ hashes straight from the file into the hasher's buffer
+            if hasattr(hashlib, "file_digest"):
+                hashlib.file_digest(f, lambda: h)
+            else:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+    return h.hexdigest()
+
+def _content_transcript_file(output_dir, digest):
+    return os.path.join(output_dir, "by_hash", f"{digest}.txt")
+
+def _reuse_content_transcript(digest, output_dir, transcript_file):
+    """Return a transcript of identical audio under transcript_file's name, or None."""
+    cached = get_cached_transcript(_content_transcript_file(output_dir, digest))
+    if not cached:
+        return None
+    
+    transcript_text = cached[1]
+    Path(transcript_file).write_text(transcript_text, encoding='utf-8')
+    return transcript_file, transcript_text
+
+def _save_content_transcript(digest, output_dir, transcript_text):
+    """Store a transcript under its audio digest for _reuse_content_transcript."""
+    content_file = _content_transcript_file(output_dir, digest)
+    os.makedirs(os.path.dirname(content_file), exist_ok=True)
+    Path(content_file).write_text(transcript_text, encoding='utf-8')
+
+def _transcribe_file_locally(audio_file_path, output_dir, digest, before_request=None):
+    logger.info(f"Transcribing audio file with faster-whisper: {audio_file_path}")
+    return _transcribe_locally(audio_file_path)
+
+def _transcribe_file_with_api(audio_file_path, output_dir, digest, before_request=None):
+    if _needs_chunking(audio_file_path):
+        logger.info(f"Transcribing long audio file in chunks with OpenAI API: {audio_file_path}")
+        return _transcribe_in_chunks(audio_file_path, output_dir, digest, before_request)
+    
+    logger.info(f"Transcribing audio file with OpenAI API: {audio_file_path}")
+    if before_request:
+        before_request()
+    return _transcribe_request(audio_file_path)
+
+def _transcribe_bytes_locally(audio, file_name, output_dir, digest, before_request=None):
+    logger.info(f"Transcribing in-memory audio with faster-whisper: {file_name} ({len(audio)} bytes)")
+    return _transcribe_locally(io.BytesIO(audio))
+
+def _transcribe_bytes_with_api(audio, file_name, output_dir, digest, before_request=None):
+    if len(audio) > CHUNK_PROBE_BYTES:
+        # Long audio is split with ffmpeg, which needs it on disk
+        with tempfile.TemporaryDirectory() as spool_dir:
+            spool_file = os.path.join(spool_dir, file_name)
+            Path(spool_file).write_bytes(audio)
+            if _needs_chunking(spool_file):
+                logger.info(f"Transcribing long in-memory audio in chunks with OpenAI API: {file_name} ({len(audio)} bytes)")
+                return _transcribe_in_chunks(spool_file, output_dir, digest, before_request)
+    
+    logger.info(f"Transcribing in-memory audio with OpenAI API: {file_name} ({len(audio)} bytes)")
+    if before_request:
+        before_request()
+    transcript = openai.audio.transcriptions.create(
+        model="whisper-1",
+        file=(file_name, audio)
+    )
+    return transcript.text
+
+# Transcription functions per TRANSCRIBER_BACKEND, resolved once at import;
+# unknown values keep using the OpenAI API as before
+_BACKENDS = {
+    "faster-whisper": (_transcribe_file_locally, _transcribe_bytes_locally),
+    "openai": (_transcribe_file_with_api, _transcribe_bytes_with_api),
+}
+_transcribe_file, _transcribe_audio_bytes = _BACKENDS.get(TRANSCRIBER_BACKEND, _BACKENDS["openai"])
+
+def transcript_file_path(output_dir, name):
+    """
+    Build the path of the transcript of name (a video ID or audio file name).
+    
+    The backend and model are part of the file name, so after switching
+    TRANSCRIBER_BACKEND or WHISPER_MODEL another model's transcript is not reused.
+    """
+    model = re.sub(r"[^A-Za-z0-9._-]+", "-", _asr_model_tag())
+    return os.path.join(output_dir, f"{name}.{model}.txt")
+
+def get_transcript_file_path(audio_file_path, output_dir, youtube_url=None):
+    """Build the transcript file path, named after the video ID or else the audio file."""
+    file_name_without_ext = os.path.splitext(os.path.basename(audio_file_path))[0]
+    
+    # Use video_id in filename if youtube_url is provided
+    if youtube_url:
+        video_id = get_video_id(youtube_url, file_name_without_ext)
+        return transcript_file_path(output_dir, video_id)
+    return transcript_file_path(output_dir, file_name_without_ext)
+
+def transcribe_audio(audio_file_path, output_dir="transcripts", youtube_url=None, before_request=None):
     """
-    Transcribe audio file to text using OpenAI's API.
+    Transcribe audio file to text using OpenAI's API or a local faster-whisper
+    model, depending on TRANSCRIBER_BACKEND.
     
     Args:
         audio_file_path (str): Path to the audio file
         output_dir (str): Directory to save the transcription
         youtube_url (str, optional): YouTube URL for file naming
+        before_request (callable, optional): Called before each OpenAI API
+            request, e.g. to wait on a rate limiter; long audio makes one
+            request per chunk, and cache hits make none
     
     Returns:
         tuple: (transcript_file_path, transcribed_text)
@@ -24,52 +350,28 @@ def transcribe_audio(audio_file_path, output_dir="transcripts", youtube_url=None
     os.makedirs(output_dir, exist_ok=True)
         
     # Prepare file paths
-    base_name = os.path.basename(audio_file_path)
-    file_name_without_ext = os.path.splitext(base_name)[0]
-    
-    # Use video_id in filename if youtube_url is provided
-    if youtube_url:
-        video_id = youtube_url.split("v=")[-1].split("&")[0] if "v=" in youtube_url else file_name_without_ext
-        transcript_file = os.path.join(output_dir, f"{video_id}.txt")
-    else:
-        transcript_file = os.path.join(output_dir, f"{file_name_without_ext}.txt")
+    transcript_file = get_transcript_file_path(audio_file_path, output_dir, youtube_url)
     
     # Check if transcript already exists
-    if os.path.exists(transcript_file):
-        logger.info(f"Transcript already exists: {transcript_file}")
-        with open(transcript_file, 'r', encoding='utf-8') as f:
-            transcript_text = f.read()
-        return transcript_file, transcript_text
-    
-    # Check if this is a fallback file and create mock transcript if it is
-    if "fallback_" in file_name_without_ext:
-        logger.info(f"Detected fallback file: {audio_file_path}, using mock transcription.")
-        return create_mock_transcript(audio_file_path, transcript_file)
+    cached = get_cached_transcript(transcript_file)
+    if cached:
+        return cached
     
     # Start timing the transcription
     start_time = time.time()
     
     try:
-        logger.info(f"Transcribing audio file with OpenAI API: {audio_file_path}")
-        
-        # Check if file exists
-        if not os.path.exists(audio_file_path):
-            raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
-        
-        # Open the audio file
-        with open(audio_file_path, "rb") as audio_file:
-            # Call OpenAI API
-            transcript = openai.audio.transcriptions.create(
-                model="whisper-1", 
-                file=audio_file
-            )
+        # Reuse the transcript of identical audio saved under another name
+        digest = audio_digest(audio_file_path)
+        reused = _reuse_content_transcript(digest, output_dir, transcript_file)
+        if reused:
+            return reused
         
-        # Extract the transcript text
-        transcript_text = transcript.text
+        transcript_text = _transcribe_file(audio_file_path, os.path.dirname(transcript_file), digest, before_request)
         
         # Save the transcript to a file
-        with open(transcript_file, 'w', encoding='utf-8') as f:
-            f.write(transcript_text)
+        Path(transcript_file).write_text(transcript_text, encoding='utf-8')
+        _save_content_transcript(digest, output_dir, transcript_text)
             
         # Calculate elapsed time
         elapsed_time = time.time() - start_time
@@ -81,26 +383,130 @@ def transcribe_audio(audio_file_path, output_dir="transcripts", youtube_url=None
         logger.error(f"Error transcribing audio: {str(e)}")
         raise
 
-def create_mock_transcript(audio_file_path, transcript_file):
-    """Create a mock transcript for testing purposes."""
+async def atranscribe_audio(audio_file_path, output_dir="transcripts", youtube_url=None):
+    """
+    Async version of transcribe_audio.
+    
+    With the OpenAI backend the request is awaited on the shared AsyncOpenAI
+    client, so many transcriptions can be in flight without a thread each;
+    the local backend runs on the default thread pool.
+    
+    Returns:
+        tuple: (transcript_file_path, transcribed_text)
+    """
+    transcript_file = get_transcript_file_path(audio_file_path, output_dir, youtube_url)
+    cached = get_cached_transcript(transcript_file)
+    if cached:
+        return cached
+    
+    if _transcribe_file is _transcribe_file_locally:
+        return await asyncio.to_thread(transcribe_audio, audio_file_path, output_dir, youtube_url)
+    
+    os.makedirs(output_dir, exist_ok=True)
+    start_time = time.time()
+    
     try:
-        # Extract video ID from the audio file path
-        video_id = os.path.splitext(os.path.basename(audio_file_path))[0].replace("fallback_", "")
+        # Reuse the transcript of identical audio saved under another name
+        digest = await asyncio.to_thread(audio_digest, audio_file_path)
+        reused = _reuse_content_transcript(digest, output_dir, transcript_file)
+        if reused:
+            return reused
         
-        # Create mock transcript content
-        mock_content = f"""This is a mock transcript for testing purposes.
-The original video ID was: {video_id}
-In a real scenario, this would contain the actual transcription of the YouTube video.
-Since we couldn't download or process the actual video, this placeholder is used instead.
-This enables testing of the full pipeline even when YouTube downloads fail."""
+        if await asyncio.to_thread(_needs_chunking, audio_file_path):
+            logger.info(f"Transcribing long audio file in chunks with OpenAI API: {audio_file_path}")
+            transcript_text = await _atranscribe_in_chunks(audio_file_path, output_dir, digest)
+        else:
+            logger.info(f"Transcribing audio file with OpenAI API: {audio_file_path}")
+            transcript_text = await _atranscribe_request(audio_file_path)
         
-        # Write the mock transcript to file
-        with open(transcript_file, 'w', encoding='utf-8') as f:
-            f.write(mock_content)
+        # Save the transcript to a file
+        Path(transcript_file).write_text(transcript_text, encoding='utf-8')
+        _save_content_transcript(digest, output_dir, transcript_text)
+        
+        elapsed_time = time.time() - start_time
+        logger.info(f"Transcription completed in {elapsed_time:.2f} seconds. Saved to: {transcript_file}")
         
-        logger.info(f"Created mock transcript: {transcript_file}")
-        return transcript_file, mock_content
+        return transcript_file, transcript_text
         
     except Exception as e:
-        logger.error(f"Error creating mock transcript: {str(e)}")
-        raise 
\ No newline at end of file
+        logger.error(f"Error transcribing audio: {str(e)}")
+        raise
+
+async def atranscribe_many(audio_file_paths, output_dir="transcripts", max_concurrency=10):
+    """
+    Transcribe several audio files concurrently.
+    
+    Args:
+        audio_file_paths (list): Paths to the audio files
+        output_dir (str): Directory to save the transcriptions
+        max_concurrency (int): Maximum transcriptions in flight at once
+    
+    Returns:
+        list: (transcript_file_path, transcribed_text) tuples in input order,
+            or the exception raised for a file that failed
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def transcribe_one(audio_file_path):
+        async with semaphore:
+            return await atranscribe_audio(audio_file_path, output_dir)
+    
+    return await asyncio.gather(
+        *(transcribe_one(audio_file_path) for audio_file_path in audio_file_paths),
+        return_exceptions=True
+    )
+
+def transcribe_many(audio_file_paths, output_dir="transcripts", max_concurrency=10):
+    """Blocking wrapper around atranscribe_many for callers without an event loop."""
+    return run_with_client(atranscribe_many(audio_file_paths, output_dir, max_concurrency))
+
+def transcribe_bytes(audio, file_name, output_dir="transcripts", before_request=None):
+    """
+    Transcribe in-memory audio to text with the configured backend.
+    
+    Args:
+        audio (bytes): Encoded audio data (mp3, m4a, webm, ...)
+        file_name (str): Name whose extension tells the API the audio format;
+            the transcript is saved under the same base name
+        output_dir (str): Directory to save the transcription
+        before_request (callable, optional): Called before each OpenAI API
+            request, as in transcribe_audio
+    
+    Returns:
+        tuple: (transcript_file_path, transcribed_text)
+    """
+    # Create output directory if it doesn't exist
+    os.makedirs(output_dir, exist_ok=True)
+    
+    transcript_file = transcript_file_path(output_dir, os.path.splitext(file_name)[0])
+    
+    # Check if transcript already exists
+    cached = get_cached_transcript(transcript_file)
+    if cached:
+        return cached
+    
+    # Start timing the transcription
+    start_time = time.time()
+    
+    try:
+        # Reuse the transcript of identical audio saved under another name
+        digest = audio_digest(audio)
+        reused = _reuse_content_transcript(digest, output_dir, transcript_file)
+        if reused:
+            return reused
+        
+        transcript_text = _transcribe_audio_bytes(audio, file_name, output_dir, digest, before_request)
+        
+        # Save the transcript to a file
+        Path(transcript_file).write_text(transcript_text, encoding='utf-8')
+        _save_content_transcript(digest, output_dir, transcript_text)
+        
+        # Calculate elapsed time
+        elapsed_time = time.time() - start_time
+        logger.info(f"Transcription completed in {elapsed_time:.2f} seconds. Saved to: {transcript_file}")
+        
+        return transcript_file, transcript_text
+        
+    except Exception as e:
+        logger.error(f"Error transcribing audio: {str(e)}")
+        raise
@@ -0,0 +1,31 @@
+import re
+from urllib.parse import urlparse, parse_qs
+
+# IDs are 11 URL-safe base64 characters
+_ID_RE = re.compile(r"[A-Za-z0-9_-]{11}")
+
+# Fallback for IDs in short links, embeds, Shorts and live URLs, or a v= the query parser missed
+_VIDEO_ID_RE = re.compile(r"(?:v=|vi=|youtu\.be/|/embed/|/shorts/|/live/|/vi?/)([A-Za-z0-9_-]{11})")
+
+def get_video_id(youtube_url, default="unknown_video"):
+    """
+    Extract the video ID from a YouTube URL.
+
+    The v= (or vi=) query parameter is preferred wherever it appears in the
+    query string; other URL forms are matched with a regex.
+
+    Args:
+        youtube_url (str): URL of the YouTube video
+        default (str): Value returned when no video ID is found
+
+    Returns:
+        str: The 11-character video ID, or default
+    """
+    query = parse_qs(urlparse(youtube_url).query)
+    for key in ("v", "vi"):
+        for value in query.get(key, ()):
+            if _ID_RE.fullmatch(value):
+                return value
+
+    match = _VIDEO_ID_RE.search(youtube_url)
+    return match.group(1) if match else default
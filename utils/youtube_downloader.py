@@ -1,17 +1,315 @@
 import os
-import logging
-from pytube import YouTube
+import asyncio
+import collections
+import functools
+import hashlib
+import json
+import shutil
+import socket
+import urllib.error
 import time
 import random
-import requests
-from pytube.exceptions import RegexMatchError, VideoUnavailable
 import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .logger import logger
+from .urls import get_video_id
+try:
+    import yt_dlp
+except ImportError:
+    yt_dlp = None
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+# Audio format to store: "original" keeps the downloaded container (m4a/webm,
+# both accepted by Whisper) and skips the ffmpeg transcode; "mp3" or "wav"
+# convert with ffmpeg
+TARGET_CODEC = os.getenv('TARGET_CODEC', 'original').lower()
 
-def download_youtube_audio(youtube_url, output_dir="downloads", max_retries=3):
+# Extra ffmpeg arguments per target codec. Whisper works on 16 kHz mono, and
+# full-rate stereo wav (~180 KB/s) would push a 10-minute chunk far past the
+# API's 25 MB upload limit, so wav is resampled while it is written
+CODEC_FFMPEG_ARGS = {"wav": ["-ar", "16000", "-ac", "1"]}
+AUDIO_EXTENSIONS = ("mp3", "m4a", "webm", "opus", "ogg", "wav")
+
+# Optional directory of downloaded audio shared by all output directories and
+# runs, e.g. ~/.cache/transcriber/yt; empty disables it
+AUDIO_CACHE_DIR = os.path.expanduser(os.getenv('YT_CACHE_DIR', ''))
+
+# Fragments of a DASH/HLS stream that yt-dlp downloads in parallel
+CONCURRENT_FRAGMENTS = 8
+
+class DownloadFailed(RuntimeError):
+    """Raised when no download method could fetch a video's audio."""
+
+class YtDlpNotInstalled(DownloadFailed):
+    """Raised by the streaming paths when the yt-dlp command line is not on PATH."""
+
+# One in-process YoutubeDL per thread and output directory, reused across
+# downloads so its HTTP connections and extractor setup are kept
+_YDL_LOCAL = threading.local()
+
+# Retry delays grow exponentially from BACKOFF_BASE_DELAY, capped at BACKOFF_MAX_DELAY
+BACKOFF_BASE_DELAY = 1.0
+BACKOFF_MAX_DELAY = 30.0
+BACKOFF_JITTER = 0.5
+
+# Doubling factors computed once; later retries reuse the last one
+_BACKOFF_FACTORS = tuple(2 ** retry for retry in range(8))
+
+def _backoff_delay(retry, base_delay=BACKOFF_BASE_DELAY, max_delay=BACKOFF_MAX_DELAY, jitter=BACKOFF_JITTER):
+    """Return the seconds to wait after failed attempt number retry, with jitter and a ceiling."""
+    factor = _BACKOFF_FACTORS[min(retry, len(_BACKOFF_FACTORS) - 1)]
+    return min(base_delay * factor + random.uniform(0, jitter), max_delay)
+
+@functools.lru_cache(maxsize=1)
+def _get_pytube_session():
+    """
+    Return the HTTP session shared by pytube requests.
+    
+    pytube otherwise opens a new connection, and pays a new TLS handshake,
+    for every request including each range of a download.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+    return session
+
+def _pytube_execute_request(url, method=None, headers=None, data=None, timeout=socket._GLOBAL_DEFAULT_TIMEOUT):
+    """
+    Drop-in replacement for pytube.request._execute_request on the shared session.
+    
+    Returns the raw urllib3 response, which supports the read() and info()
+    calls pytube makes, and raises the urllib errors pytube handles. Streamed
+    bodies return their connection to the pool once read to the end.
+    """
+    base_headers = {"User-Agent": "Mozilla/5.0", "accept-language": "en-US,en"}
+    if headers:
+        base_headers.update(headers)
+    if data and not isinstance(data, bytes):
+        data = json.dumps(data).encode("utf-8")
+    if not url.lower().startswith("http"):
+        raise ValueError("Invalid URL")
+    if timeout is socket._GLOBAL_DEFAULT_TIMEOUT:
+        timeout = None
+    
+    import requests
+    try:
+        response = _get_pytube_session().request(
+            method or ("POST" if data else "GET"), url,
+            headers=base_headers, data=data, timeout=timeout, stream=True
+        )
+    except requests.Timeout as e:
+        raise urllib.error.URLError(socket.timeout(str(e)))
+    except requests.ConnectionError as e:
+        raise urllib.error.URLError(e)
+    
+    # Error bodies and HEAD responses are never read by pytube, so drain them
+    # here and hand the connection back to the pool instead of leaving it held
+    if response.status_code >= 400:
+        response.raw.drain_conn()
+        response.raw.release_conn()
+        raise urllib.error.HTTPError(url, response.status_code, response.reason, response.headers, None)
+    if method == "HEAD":
+        response.raw.release_conn()
+    response.raw.decode_content = True
+    return response.raw
+
+@functools.lru_cache(maxsize=1)
+def _import_pytube():
+    """
+    Import pytube on first use and route its requests through the shared session.
+    
+    pytube is only needed when yt-dlp fails, so it is kept out of module import.
+    
+    Returns:
+        type: pytube's YouTube class
+    """
+    import pytube.request
+    from pytube import YouTube
+    pytube.request._execute_request = _pytube_execute_request
+    return YouTube
+
+def get_cached_audio(youtube_url, output_dir="downloads"):
+    """
+    Return the audio file downloaded for this video by an earlier run, if any.
+    
+    Args:
+        youtube_url (str): URL of the YouTube video
+        output_dir (str): Directory holding downloaded audio
+    
+    Returns:
+        str: Path to the non-empty {video_id}.<ext> audio file, or None
+    """
+    video_id = get_video_id(youtube_url)
+    
+    for ext in AUDIO_EXTENSIONS:
+        output_path = os.path.join(output_dir, f"{video_id}.{ext}")
+        # One stat() covers both the existence and the non-empty check
+        try:
+            if os.stat(output_path).st_size == 0:
+                continue
+        except FileNotFoundError:
+            continue
+        
+        logger.info(f"Audio file already exists: {output_path}")
+        return output_path
+    return None
+
+def _file_sha256(path):
+    """Return the hex SHA-256 digest of a file without loading it into memory."""
+    with open(path, "rb") as f:
+        # Python 3.11+ hashes straight from the file into the hasher's buffer
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _restore_from_audio_cache(video_id, output_dir):
+    """
+    Link or copy this video's audio from AUDIO_CACHE_DIR into output_dir.
+    
+    An entry is trusted when its size and modification time match its .sha256
+    sidecar; only when they changed is the file re-hashed and compared with the
+    recorded digest, so a cache hit does not read the whole file.
+    
+    Returns:
+        str: Path to the audio file in output_dir, or None on a miss
+    """
+    if not AUDIO_CACHE_DIR:
+        return None
+    
+    for ext in AUDIO_EXTENSIONS:
+        cached_file = os.path.join(AUDIO_CACHE_DIR, f"{video_id}.{ext}")
+        try:
+            with open(f"{cached_file}.sha256", encoding="utf-8") as f:
+                digest, size, mtime_ns = f.read().split()
+            stat = os.stat(cached_file)
+            unchanged = stat.st_size == int(size) and stat.st_mtime_ns == int(mtime_ns)
+            if not unchanged and _file_sha256(cached_file) != digest:
+                logger.warning(f"Cached audio {cached_file} does not match its checksum, ignoring it")
+                continue
+        except (OSError, ValueError):
+            continue
+        
+        output_path = os.path.join(output_dir, f"{video_id}.{ext}")
+        try:
+            os.link(cached_file, output_path)
+        except OSError:
+            # Different file system, or links unsupported
+            shutil.copyfile(cached_file, output_path)
+        logger.info(f"Audio restored from cache: {cached_file}")
+        return output_path
+    return None
+
+def _store_in_audio_cache(audio_file_path):
+    """Add a finished download to AUDIO_CACHE_DIR with a .sha256 sidecar."""
+    if not AUDIO_CACHE_DIR:
+        return
+    
+    name = os.path.basename(audio_file_path)
+    try:
+        os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+        # Stage in a private directory, so workers caching the same video never
+        # share a temporary name, and publish with os.replace once complete
+        with tempfile.TemporaryDirectory(dir=AUDIO_CACHE_DIR, prefix=".staging-") as staging_dir:
+            staged_file = os.path.join(staging_dir, name)
+            try:
+                os.link(audio_file_path, staged_file)
+            except OSError:
+                # Different file system, or links unsupported
+                shutil.copyfile(audio_file_path, staged_file)
+            
+            staged_sidecar = f"{staged_file}.sha256"
+            stat = os.stat(staged_file)
+            with open(staged_sidecar, "w", encoding="utf-8") as f:
+                f.write(f"{_file_sha256(staged_file)} {stat.st_size} {stat.st_mtime_ns}")
+            
+            os.replace(staged_file, os.path.join(AUDIO_CACHE_DIR, name))
+            os.replace(staged_sidecar, os.path.join(AUDIO_CACHE_DIR, f"{name}.sha256"))
+    except OSError as e:
+        logger.warning(f"Could not store {audio_file_path} in the audio cache: {str(e)}")
+
+@functools.lru_cache(maxsize=1)
+def _yt_dlp_path():
+    """Locate the yt-dlp executable on PATH, once per process."""
+    return shutil.which("yt-dlp")
+
+def _get_ydl(output_dir):
+    """Return this thread's YoutubeDL instance for output_dir, creating it on first use."""
+    instances = getattr(_YDL_LOCAL, "instances", None)
+    if instances is None:
+        instances = _YDL_LOCAL.instances = {}
+    if output_dir not in instances:
+        instances[output_dir] = yt_dlp.YoutubeDL({
+            "format": "bestaudio/best",
+            "outtmpl": os.path.join(output_dir, "%(id)s.%(ext)s"),
+            "postprocessors": [] if TARGET_CODEC == "original" else [
+                {"key": "FFmpegExtractAudio", "preferredcodec": TARGET_CODEC}
+            ],
+            "postprocessor_args": {"extractaudio": CODEC_FFMPEG_ARGS.get(TARGET_CODEC, [])},
+            "concurrent_fragment_downloads": CONCURRENT_FRAGMENTS,
+            "quiet": True,
+            "no_warnings": True,
+            "noprogress": True
+        })
+    return instances[output_dir]
+
+def _download_with_ydl(youtube_url, output_dir):
+    """Download audio with the in-process yt-dlp, returning the audio file path."""
+    info = _get_ydl(output_dir).extract_info(youtube_url, download=True)
+    downloads = info.get("requested_downloads") or [{}]
+    return downloads[0].get("filepath") or os.path.join(output_dir, f"{info['id']}.{info.get('ext', 'mp3')}")
+
+# Set once yt-dlp has downloaded a video in this process
+_YT_DLP_SUCCEEDED = threading.Event()
+
+# Extra yt-dlp attempts for a transient failure once yt-dlp has succeeded in this process
+STICKY_EXTRA_RETRIES = 2
+
+# yt-dlp error text for failures that retrying cannot fix, and for ones that
+# usually clear up after a wait (rate limits, timeouts, 5xx responses)
+_PERMANENT_ERROR_MARKERS = (
+    "private video", "video unavailable", "not a valid url", "unsupported url",
+    "has been removed", "members-only", "sign in to confirm your age"
+)
+_TRANSIENT_ERROR_MARKERS = (
+    "429", "too many requests", "timed out", "timeout", "temporar",
+    "connection reset", "connection refused", "http error 5"
+)
+
+def _error_matches(message, markers):
+    """Return whether an error message contains any of markers, ignoring case."""
+    message = message.lower()
+    return any(marker in message for marker in markers)
+
+def _convert_audio(audio_file_path, codec):
+    """Transcode audio to codec with ffmpeg, returning the new path, or the original path if that fails."""
+    base, ext = os.path.splitext(audio_file_path)
+    if ext == f".{codec}":
+        return audio_file_path
+    
+    converted_file = f"{base}.{codec}"
+    temp_file = f"{base}.tmp.{codec}"
+    try:
+        subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", audio_file_path, "-vn",
+             *CODEC_FFMPEG_ARGS.get(codec, []), temp_file],
+            check=True
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.warning(f"Could not convert {audio_file_path} to {codec} ({str(e)}), keeping the original container")
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        return audio_file_path
+    
+    os.replace(temp_file, converted_file)
+    os.remove(audio_file_path)
+    return converted_file
+
+def download_youtube_audio(youtube_url, output_dir="downloads", max_retries=3, use_yt_dlp=True):
     """
     Download audio from a YouTube video using yt-dlp as primary method.
     Falls back to pytube if yt-dlp fails.
@@ -20,103 +318,293 @@ def download_youtube_audio(youtube_url, output_dir="downloads", max_retries=3):
         youtube_url (str): URL of the YouTube video
         output_dir (str): Directory to save the downloaded audio
         max_retries (int): Maximum number of retry attempts
+        use_yt_dlp (bool): Whether to try yt-dlp at all; False goes straight to
+            pytube, e.g. when yt-dlp has already failed for this URL
     
     Returns:
         str: Path to the downloaded audio file
+    
+    Raises:
+        DownloadFailed: If neither yt-dlp nor pytube could download the audio
     """
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
     # Extract video ID for consistent naming
-    video_id = youtube_url.split("v=")[-1].split("&")[0] if "v=" in youtube_url else "unknown_video"
+    video_id = get_video_id(youtube_url)
     output_path = os.path.join(output_dir, f"{video_id}.mp3")
     
-    # Check if file already exists
-    if os.path.exists(output_path):
-        logger.info(f"Audio file already exists: {output_path}")
-        return output_path
+    # Reuse audio downloaded by an earlier run
+    cached_path = get_cached_audio(youtube_url, output_dir) or _restore_from_audio_cache(video_id, output_dir)
+    if cached_path:
+        return cached_path
+    
+    # Skip the yt-dlp attempts, and their backoff, when it is not installed at all
+    has_yt_dlp = use_yt_dlp and (yt_dlp is not None or _yt_dlp_path() is not None)
+    if use_yt_dlp and not has_yt_dlp:
+        logger.warning("yt-dlp is not installed")
+    
+    attempts = max_retries if has_yt_dlp else 0
+    extra_retries = STICKY_EXTRA_RETRIES if _YT_DLP_SUCCEEDED.is_set() else 0
+    
+    # The yt-dlp command line is the same for every attempt, so build it once
+    if yt_dlp is None and attempts:
+        cmd = [
+            _yt_dlp_path(), 
+            "-f", "bestaudio/best",
+            "-N", str(CONCURRENT_FRAGMENTS),
+            "-o", os.path.join(output_dir, f"{video_id}.%(ext)s"), 
+            youtube_url
+        ]
+        if TARGET_CODEC != "original":
+            cmd[1:1] = ["-x", "--audio-format", TARGET_CODEC]
+        if TARGET_CODEC in CODEC_FFMPEG_ARGS:
+            cmd[1:1] = ["--postprocessor-args", f"ExtractAudio:{' '.join(CODEC_FFMPEG_ARGS[TARGET_CODEC])}"]
     
     # Try yt-dlp first
-    for retry in range(max_retries):
+    retry = 0
+    while retry < attempts:
         try:
-            logger.info(f"Attempting to download with yt-dlp (attempt {retry + 1}/{max_retries})")
+            logger.info(f"Attempting to download with yt-dlp (attempt {retry + 1}/{attempts})")
             
-            # Use yt-dlp to download the audio
-            cmd = [
-                "yt-dlp", 
-                "-x", "--audio-format", "mp3",
-                "-o", os.path.join(output_dir, f"{video_id}.%(ext)s"), 
-                youtube_url
-            ]
+            # Prefer the in-process API, which skips a process start per video
+            if yt_dlp is not None:
+                downloaded_path = _download_with_ydl(youtube_url, output_dir)
+                _YT_DLP_SUCCEEDED.set()
+                _store_in_audio_cache(downloaded_path)
+                logger.info(f"Audio downloaded successfully with yt-dlp: {downloaded_path}")
+                return downloaded_path
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            # Use the yt-dlp command line, streaming stderr and keeping only its tail
+            with subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, bufsize=1) as process:
+                stderr_tail = collections.deque(process.stderr, maxlen=20)
+                returncode = process.wait()
             
-            if result.returncode == 0:
-                logger.info(f"Audio downloaded successfully with yt-dlp: {output_path}")
-                return output_path
-            else:
-                logger.warning(f"yt-dlp attempt {retry + 1} failed: {result.stderr}")
-                
-                # Add exponential backoff with jitter
-                if retry < max_retries - 1:
-                    backoff_time = (2 ** retry) + (random.random() * 0.5)
-                    time.sleep(backoff_time)
+            if returncode == 0:
+                downloaded_path = get_cached_audio(youtube_url, output_dir) or output_path
+                _YT_DLP_SUCCEEDED.set()
+                _store_in_audio_cache(downloaded_path)
+                logger.info(f"Audio downloaded successfully with yt-dlp: {downloaded_path}")
+                return downloaded_path
+            
+            error = ''.join(stderr_tail)
+            logger.warning(f"yt-dlp attempt {retry + 1} failed: {error}")
                 
         except Exception as e:
-            logger.warning(f"yt-dlp attempt {retry + 1} failed with error: {str(e)}")
-            if retry < max_retries - 1:
-                time.sleep(2 ** retry)
+            error = str(e)
+            logger.warning(f"yt-dlp attempt {retry + 1} failed with error: {error}")
+        
+        # A private, removed or malformed video fails the same way on every attempt
+        if _error_matches(error, _PERMANENT_ERROR_MARKERS):
+            break
+        
+        # Once yt-dlp has worked in this process a rate limit or timeout is likely
+        # to clear up, so give it extra attempts before the slower pytube fallback
+        if retry == attempts - 1 and extra_retries and _error_matches(error, _TRANSIENT_ERROR_MARKERS):
+            attempts += extra_retries
+            extra_retries = 0
+        
+        # Add exponential backoff with jitter
+        if retry < attempts - 1:
+            time.sleep(_backoff_delay(retry))
+        retry += 1
     
     # If yt-dlp fails, try pytube as fallback
     logger.info("Falling back to pytube...")
     try:
+        YouTube = _import_pytube()
         yt = YouTube(youtube_url)
         audio_stream = yt.streams.filter(only_audio=True).first()
         
         if not audio_stream:
             raise Exception("No audio stream found")
             
-        downloaded_file = audio_stream.download(output_path=output_dir, filename=video_id)
-        
-        # Rename to mp3 extension if needed
-        base, ext = os.path.splitext(downloaded_file)
-        new_file = base + '.mp3'
+        # Download to a name unique to this attempt, so concurrent downloads of
+        # the same video never write to the same file
+        fd, temp_file = tempfile.mkstemp(dir=output_dir, prefix=f".{video_id}.", suffix=".part")
+        os.close(fd)
+        try:
+            audio_stream.download(output_path=output_dir, filename=os.path.basename(temp_file), skip_existing=False)
+            
+            # Publish under the real container's extension only once the download is complete
+            source_ext = 'm4a' if audio_stream.subtype == 'mp4' else audio_stream.subtype
+            new_file = os.path.join(output_dir, f"{video_id}.{source_ext}")
+            os.replace(temp_file, new_file)
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
         
-        if downloaded_file != new_file and ext != '.mp3':
-            os.rename(downloaded_file, new_file)
+        if TARGET_CODEC != "original":
+            new_file = _convert_audio(new_file, TARGET_CODEC)
         
+        _store_in_audio_cache(new_file)
         logger.info(f"Audio downloaded successfully with pytube: {new_file}")
         return new_file
         
     except Exception as e:
         logger.error(f"All download methods failed: {str(e)}")
-        return create_fallback_audio_file(output_dir, video_id)
+        raise DownloadFailed(f"Could not download audio for {video_id}: {str(e)}") from e
+
+def download_many(youtube_urls, output_dir="downloads", max_workers=8, max_retries=3):
+    """
+    Download audio for several YouTube videos in parallel threads.
+    
+    Downloads are network-bound, so threads overlap well. URLs of the same
+    video are downloaded once, so no two workers write the same file. A URL
+    that fails does not abort the other downloads.
+    
+    Args:
+        youtube_urls (list): URLs of the YouTube videos
+        output_dir (str): Directory to save the downloaded audio
+        max_workers (int): Maximum downloads running at once
+        max_retries (int): Maximum yt-dlp attempts per URL
+    
+    Returns:
+        list: Audio file paths in input order, or the exception raised for a
+            URL that failed
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    
+    def download_one(youtube_url):
+        try:
+            return download_youtube_audio(youtube_url, output_dir, max_retries)
+        except Exception as e:
+            logger.error(f"Download of {youtube_url} failed: {str(e)}")
+            return e
+    
+    # One download per video ID; dict keys keep the first URL seen for each
+    urls_by_id = {}
+    for youtube_url in youtube_urls:
+        urls_by_id.setdefault(get_video_id(youtube_url), youtube_url)
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        paths_by_id = dict(zip(urls_by_id, executor.map(download_one, urls_by_id.values())))
+    return [paths_by_id[get_video_id(youtube_url)] for youtube_url in youtube_urls]
 
-def create_fallback_audio_file(output_dir, video_id):
+async def adownload_youtube_audio(youtube_url, output_dir="downloads", max_retries=3):
+    """Async version of download_youtube_audio, run on the default thread pool."""
+    return await asyncio.to_thread(download_youtube_audio, youtube_url, output_dir, max_retries)
+
+async def adownload_many(youtube_urls, output_dir="downloads", max_concurrency=4):
     """
-    Create a fallback audio file for testing when YouTube download fails.
+    Download audio for several YouTube videos concurrently.
     
     Args:
-        output_dir (str): Directory to save the fallback file
-        video_id (str): The YouTube video ID
+        youtube_urls (list): URLs of the YouTube videos
+        output_dir (str): Directory to save the downloaded audio
+        max_concurrency (int): Maximum downloads running at once
     
     Returns:
-        str: Path to the fallback file
+        list: Audio file paths in input order, or the exception raised for a
+            URL that failed
     """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def download_one(youtube_url):
+        async with semaphore:
+            return await adownload_youtube_audio(youtube_url, output_dir)
+    
+    return await asyncio.gather(
+        *(download_one(youtube_url) for youtube_url in youtube_urls),
+        return_exceptions=True
+    )
+
+def _guess_audio_extension(data):
+    """Guess the container format of downloaded audio from its leading bytes."""
+    if data[4:8] == b"ftyp":
+        return "m4a"
+    if data[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if data[:4] == b"OggS":
+        return "ogg"
+    return "mp3"
+
+def stream_youtube_audio(youtube_url, chunk_size=1 << 16):
+    """
+    Stream the best audio stream of a YouTube video from a yt-dlp pipe.
+    
+    Chunks are yielded while yt-dlp is still downloading, so a consumer can
+    start working on the audio before the download has finished.
+    
+    Args:
+        youtube_url (str): URL of the YouTube video
+        chunk_size (int): Number of bytes to read from the pipe at a time
+    
+    Yields:
+        bytes: Consecutive chunks of the audio stream in its source container
+    
+    Raises:
+        YtDlpNotInstalled: If the yt-dlp command line is not installed
+        RuntimeError: If yt-dlp exits with an error
+    """
+    if _yt_dlp_path() is None:
+        raise YtDlpNotInstalled("yt-dlp is not installed")
+    
+    cmd = [_yt_dlp_path(), "-f", "bestaudio/best", "-o", "-", "--quiet", youtube_url]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    
+    # Drain stderr in the background so a chatty yt-dlp cannot fill the pipe and block,
+    # keeping only its last lines for the error message
+    stderr_tail = collections.deque(maxlen=20)
+    stderr_reader = threading.Thread(target=lambda: stderr_tail.extend(proc.stderr), daemon=True)
+    stderr_reader.start()
+    
     try:
-        fallback_file = os.path.join(output_dir, f"fallback_{video_id}.mp3")
-        
-        # Create a simple text file as fallback
-        with open(fallback_file, 'w') as f:
-            f.write("This is a fallback audio file for testing purposes.")
+        while chunk := proc.stdout.read(chunk_size):
+            yield chunk
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+        stderr_reader.join()
+    
+    if returncode != 0:
+        stderr = b"".join(stderr_tail).decode("utf-8", errors="replace")
+        raise RuntimeError(f"yt-dlp exited with code {returncode}: {stderr}")
+
+def download_youtube_audio_bytes(youtube_url, max_retries=3):
+    """
+    Download the best audio stream of a YouTube video into memory with yt-dlp.
+    
+    The stream is read from a pipe in its source container and never touches
+    the disk, so no mp3 conversion or temporary file is needed.
+    
+    Args:
+        youtube_url (str): URL of the YouTube video
+        max_retries (int): Maximum number of retry attempts
+    
+    Returns:
+        tuple: (audio_bytes, file_name) where file_name carries the video ID and
+            the container extension expected by the transcription API
+    
+    Raises:
+        YtDlpNotInstalled: If the yt-dlp command line is not installed
+        DownloadFailed: If no attempt returned any audio
+    """
+    video_id = get_video_id(youtube_url)
+    
+    # Retrying cannot help when the yt-dlp command line is missing
+    if _yt_dlp_path() is None:
+        raise YtDlpNotInstalled("yt-dlp is not installed")
+    
+    for retry in range(max_retries):
+        logger.info(f"Downloading audio into memory with yt-dlp (attempt {retry + 1}/{max_retries})")
         
-        logger.info(f"Created fallback audio file: {fallback_file}")
-        return fallback_file
+        try:
+            audio = bytearray()
+            for chunk in stream_youtube_audio(youtube_url):
+                audio += chunk
+            
+            if audio:
+                audio = bytes(audio)
+                file_name = f"{video_id}.{_guess_audio_extension(audio)}"
+                logger.info(f"Audio downloaded into memory with yt-dlp: {file_name} ({len(audio)} bytes)")
+                return audio, file_name
+            logger.warning(f"yt-dlp attempt {retry + 1} returned no audio")
+        except RuntimeError as e:
+            logger.warning(f"yt-dlp attempt {retry + 1} failed: {str(e)}")
         
-    except Exception as e:
-        logger.error(f"Failed to create fallback file: {str(e)}")
-        # Final emergency fallback
-        minimal_fallback = os.path.join(os.getcwd(), "emergency_fallback.mp3")
-        with open(minimal_fallback, 'w') as f:
-            f.write("Emergency fallback file")
-        return minimal_fallback 
\ No newline at end of file
+        # Add exponential backoff with jitter
+        if retry < max_retries - 1:
+            time.sleep(_backoff_delay(retry))
+    
+    raise DownloadFailed(f"Could not download audio into memory for {video_id}")